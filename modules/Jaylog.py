@@ -5,7 +5,7 @@ __version__ = "v0.1.0-beta"
 
 import logging
 from pathlib import Path
-import colorama
+from colorama import init, Fore, Style
 init(autoreset=True)
 
 class ColorFormatter(logging.Formatter):
@@ -11,17 +11,31 @@ __version__ = "v0.1.0-beta"
 
 # ============================== Imports ======================================
 import os
-import json
-import request
+import asyncio
+import logging
+import requests
 import dns.resolver
-import modules.Jaylog
+from modules.Jaylog import mklog
 import modules.db
+import modules.json
+import modules.config
+import modules.bencode
+import modules.filters
+import modules.release
+import modules.resolver
+import modules.radarr
+import modules.qbittorrent
+import modules.scheduler
+import modules.timeline
+import modules.storage
+import modules.prefetch
+import modules.instances
 from pydantic import BaseModel
 #from typing import Optional
 
 # ============================== Globals ======================================
 
-autobrr_logger = setup_logger(level="DEBUG", log_path="../logs/autobrr.log")
+autobrr_logger = mklog(__name__, level="DEBUG", logfile="../logs/autobrr.log")
 
 # ============================== Functions ====================================
 
@@ -30,11 +44,10 @@ def isAlive() -> bool:
     Return True if Autobrr is alive and DNS resolves via external query.
     """
     try:
-        with open("../json/config.json", "r") as f:
-            config = json.load(f)
-            autobrr_cfg = config.get("autobrr", {})
-            host_url = autobrr_cfg.get("host", "")
-            token = autobrr_cfg.get("apikey", "")
+        config = modules.json.load("../json/config.json")
+        autobrr_cfg = config.get("autobrr", {})
+        host_url = autobrr_cfg.get("host", "")
+        token = autobrr_cfg.get("apikey", "")
     except Exception:
         return False
 
@@ -60,35 +73,218 @@ def isAlive() -> bool:
 
 _payload_buffer = None  # Internal memory store
 
-def acceptPayload(payload: dict) -> dict:
+def loadFilters() -> dict:
+    """
+    Return the 'filters' section of the loaded config.
+    """
+    return modules.config.FILTERS
+
+
+def inspectTorrent(payload: dict) -> dict:
+    """
+    Parse the torrent attached to the payload (raw bytes or tmp file)
+    and verify it against the announce. Returns None if there is no
+    torrent to look at.
+    """
+    buf = modules.bencode.load_payload_torrent(payload)
+    if buf is None:
+        return None
+
+    try:
+        info = modules.bencode.torrent_info(buf)
+    except modules.bencode.BencodeError as e:
+        autobrr_logger.warning(f"Unreadable torrent for {payload.get('TorrentName')}: {e}")
+        return {"torrent": None, "verify": {"status": "invalid", "reasons": [str(e)]}}
+    finally:
+        if hasattr(buf, "close"):
+            buf.close()
+
+    return {"torrent": info, "verify": modules.bencode.verify_payload(info, payload)}
+
+
+async def admitPayload(payload: dict, timeline) -> dict:
+    """
+    Intake stages up to (not including) storage: parse, resolve, verify,
+    filter and dedup. The .torrent download starts first and overlaps
+    them. Returns {"status": "accepted"} or why not.
+    """
+    if not isinstance(payload, dict):
+        return {"status": "error", "reason": "Payload must be a dictionary"}
+
+    payload["event_id"] = timeline.event_id
+    modules.prefetch.prefetcher().start(payload)
+
+    modules.release.normalize_payload(payload)
+    timeline.mark("parse")
+    await modules.resolver.fill_payload(payload)
+    timeline.mark("resolve")
+
+    inspected = inspectTorrent(payload)
+    if inspected and inspected["verify"]["status"] != "ok":
+        timeline.finish("rejected")
+        return {"status": "rejected", "reason": "; ".join(inspected["verify"]["reasons"])}
+
+    verdict = modules.filters.check(payload, loadFilters(), torrent=inspected and inspected["torrent"])
+    timeline.mark("filter")
+    if verdict["status"] != "accepted":
+        timeline.finish("rejected")
+        return verdict
+
+    if modules.storage.backend().seen(modules.db.event_key(payload)):
+        timeline.finish("duplicate")
+        return {"status": "duplicate"}
+    timeline.mark("dedup")
+
+    return {"status": "accepted"}
+
+
+async def acceptPayload(payload: dict, timeline=None) -> dict:
     """
     Entry point for raw Autobrr payload.
     Takes possession of the incoming JSON and stores it in memory.
+    Every stage is marked on the event's timeline.
     Returns success status.
     """
     global _payload_buffer
 
-    if not isinstance(payload, dict):
-        return {"status": "error", "reason": "Payload must be a dictionary"}
+    timeline = timeline or modules.timeline.Timeline()
+    verdict = await admitPayload(payload, timeline)
+    if verdict["status"] != "accepted":
+        modules.prefetch.prefetcher().cancel(payload)
+        return verdict
+
+    seq = storeJSON(payload)
+    if seq is None:
+        # A concurrent announce of the same release got stored first
+        modules.prefetch.prefetcher().cancel(payload)
+        timeline.finish("duplicate")
+        return {"status": "duplicate"}
+    timeline.mark("store")
 
     _payload_buffer = payload
-    return {"status": "accepted"}
+    scheduleGrab(payload, timeline)
+    return {"status": "accepted", "event_id": timeline.event_id, "seq": seq}
+
+
+async def acceptBatch(payloads: list) -> list:
+    """
+    Bulk intake: admit records concurrently, store the accepted ones in
+    one write, then queue grabs for the rows that were actually stored.
+    Duplicates within the batch, or stored meanwhile by another request,
+    count as duplicates. Returns one result per input, in order.
+    """
+    global _payload_buffer
+
+    timelines = [modules.timeline.Timeline() for _ in payloads]
+    results = list(await asyncio.gather(*(admitPayload(p, t) for p, t in zip(payloads, timelines)),
+                                        return_exceptions=True))
+
+    seen = set()
+    accepted = []
+    for n, (payload, result) in enumerate(zip(payloads, results)):
+        if isinstance(result, BaseException):
+            autobrr_logger.warning(f"Batch record {n} failed intake: {result!r}")
+            timelines[n].finish("error")
+            result = results[n] = {"status": "error", "reason": str(result) or type(result).__name__}
+        if result["status"] != "accepted":
+            modules.prefetch.prefetcher().cancel(payload)
+            continue
+        key = modules.db.event_key(payload)
+        if key and key in seen:
+            timelines[n].finish("duplicate")
+            results[n] = {"status": "duplicate"}
+            continue
+        seen.add(key)
+        accepted.append(n)
+
+    stored = modules.storage.backend().store_many("autobrr", [payloads[n] for n in accepted]) if accepted else []
+
+    for n, seq in zip(accepted, stored):
+        if seq is None:
+            modules.prefetch.prefetcher().cancel(payloads[n])
+            timelines[n].finish("duplicate")
+            results[n] = {"status": "duplicate"}
+            continue
+        timelines[n].mark("store")
+        scheduleGrab(payloads[n], timelines[n])
+        results[n] = {"status": "accepted", "event_id": timelines[n].event_id, "seq": seq}
+        _payload_buffer = payloads[n]
+
+    return results
+
+
+def scheduleGrab(payload: dict, timeline):
+    """
+    Queue the grab. The scheduler retries failed attempts; the timeline
+    is closed as an error only once it gives up.
+    """
+    future = modules.scheduler.scheduler.submit(payload, grabRelease, payload, timeline)
+    future.add_done_callback(lambda _: timeline.finish("error"))
+    return future
+
+
+async def grabRelease(payload: dict, timeline) -> dict:
+    """
+    Scheduled grab: skip movies any Radarr instance already has, otherwise
+    upload the .torrent to the routed qBittorrent instance (falling back
+    to its URL if we could not get the file). Each call goes through its
+    instance's upstream guard. Failures are marked and re-raised so the
+    scheduler can retry.
+    """
+    timeline.mark("queued")
+    try:
+        imdb_id = payload.get("MetaIMDB")
+        if imdb_id:
+            answers = await modules.instances.fan_out("radarr", modules.radarr.has_movie, imdb_id)
+            timeline.mark("radarr")
+            failed = [a for _, a in answers if isinstance(a, BaseException)]
+            for instance, answer in answers:
+                if isinstance(answer, BaseException):
+                    autobrr_logger.warning(f"Library check on radarr '{instance.name}' failed: {answer}")
+            if answers and len(failed) == len(answers):
+                raise failed[0]
+            if any(answer is True for _, answer in answers):
+                autobrr_logger.info(f"Already in library, skipping: {payload.get('TorrentName')}")
+                timeline.finish("skipped")
+                return {"status": "skipped", "reason": "Already in library"}
+
+        data = await modules.prefetch.prefetcher().torrent_bytes(payload)
+        timeline.mark("torrent")
+        url = payload.get("DownloadURL") or payload.get("TorrentUrl")
+        if not data and not url:
+            timeline.finish("error")
+            return {"status": "error", "reason": "No download URL"}
+
+        qbit = modules.instances.pick("qbittorrent", payload)
+        if data:
+            filename = f"{payload.get('TorrentName') or 'release'}.torrent"
+            result = await qbit.call(modules.qbittorrent.add_torrent_file, data, filename)
+        else:
+            result = await qbit.call(modules.qbittorrent.add_torrent, url)
+        timeline.mark("qbittorrent")
+        timeline.finish("added")
+        return result
+    except Exception:
+        timeline.mark("failed")
+        raise
 
 
 def logJSON(payload: dict):
     """
     Log the JSON object to console or file or both.
     """
-    logger.debug(f"Autobrr payload: {json.dumps(payload, indent=2)}")
+    if autobrr_logger.isEnabledFor(logging.DEBUG):
+        autobrr_logger.debug(f"Autobrr payload: {modules.json.encode_str(payload)}")
 
-def storeJSON(payload: dict):
+def storeJSON(payload: dict) -> int:
     """
     This is mainly just an abstraction
-    Store the validated payload in SQLite.
+    Store the validated payload via the configured storage backend.
     I want this to mainly just call the db.py function. 
     This is NOT the place for db code
+    Returns the stored event's sequence number (row id for SQLite).
     """
-    store_json(source="autobrr", payload=payload)
+    return modules.storage.backend().store(source="autobrr", payload=payload)
 
 def singleKey(payload: dict) -> dict:
     """
@@ -1,16 +1,18 @@
-import json
 import os
+import modules.json
 
 CONFIG_PATH = os.getenv("CONFIG_PATH", "./config.json")
 
-with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-    config = json.load(f)
+config = modules.json.load(CONFIG_PATH)
 
 # Accessors
 AUTOBRR = config.get("autobrr", {})
 RADARR = config.get("radarr", {})
 QBITTORRENT = config.get("qbittorrent", {})
 FILTERS = config.get("filters", {})
+SCHEDULER = config.get("scheduler", {})
+STORAGE = config.get("storage", {})
+PREFETCH = config.get("prefetch", {})
 
 # Optional: flatten common keys
 AUTOBRR_HOST = AUTOBRR.get("host")
@@ -22,6 +24,7 @@ RADARR_APIKEY = RADARR.get("apikey")
 QBIT_HOST = QBITTORRENT.get("host")
 QBIT_USER = QBITTORRENT.get("username")
 QBIT_PASS = QBITTORRENT.get("password")
+QBIT_CATEGORY = QBITTORRENT.get("category", "radarr")
 
 MIN_SEEDERS = FILTERS.get("min_seeders", 0)
 QUALITY = FILTERS.get("quality", [])
@@ -12,8 +12,8 @@ __version__ = "v0.0.5-beta"
 
 import sqlite3
 import os
-import json
-import modules.Jaylog
+from datetime import datetime, timezone
+from modules.Jaylog import mklog
 import modules.json
 
 # ============================== Constants ====================================
@@ -22,7 +22,7 @@ DB_PATH = os.getenv("SQLITE_DB_PATH", "./logs/squatflix.db")
 
 # ============================== Logging ====================================
 
-logger = mklog(name="sqlite", level="DEBUG", logfile="/home/joshua/scripts/squat_flix_importer/logs/db.log")
+logger = mklog(name="sqlite", level="DEBUG", logfile="../logs/db.log")
 logger.debug(f"Using SQLite DB path: {DB_PATH}")
 
 # ============================== Initialize ====================================
@@ -38,29 +38,129 @@ def init():
                 timestamp TEXT NOT NULL,
                 source TEXT NOT NULL,
                 imdb_id TEXT,
-                payload TEXT NOT NULL
+                payload TEXT NOT NULL,
+                dedup_key TEXT
             )
         """)
+        columns = [row[1] for row in cursor.execute("PRAGMA table_info(events)")]
+        if "dedup_key" not in columns:
+            logger.debug("Adding dedup_key column to events")
+            cursor.execute("ALTER TABLE events ADD COLUMN dedup_key TEXT")
+        cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_events_dedup ON events (dedup_key)")
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS resolution_cache (
+                title TEXT NOT NULL,
+                year INTEGER NOT NULL,
+                imdb_id TEXT,
+                tmdb_id INTEGER,
+                expires_at REAL NOT NULL,
+                PRIMARY KEY (title, year)
+            )
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS event_timeline (
+                event_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                stage TEXT NOT NULL,
+                offset_ms REAL NOT NULL,
+                started_at REAL NOT NULL,
+                PRIMARY KEY (event_id, seq)
+            ) WITHOUT ROWID
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_timeline_started ON event_timeline (started_at)")
         conn.commit()
     logger.debug("Database initialized successfully")
 
 # ============================== Store ====================================
 
-def store_json(source: str, payload: dict):
+def event_key(payload: dict) -> str:
+    """
+    Identity of a release across re-announces and re-imports.
+    """
+    if payload.get("TorrentHash"):
+        return f"hash:{payload['TorrentHash'].lower()}"
+    if payload.get("TorrentID"):
+        return f"id:{payload.get('Indexer') or ''}:{payload['TorrentID']}"
+    if payload.get("TorrentName"):
+        return f"name:{payload.get('Indexer') or ''}:{payload['TorrentName']}"
+    return None
+
+
+def event_row(source: str, payload: dict, timestamp: str = None) -> tuple:
+    """
+    Build the (timestamp, source, imdb_id, payload, dedup_key) row for an event.
+    """
+    return (
+        timestamp or payload.get("timestamp") or datetime.now(timezone.utc).isoformat(),
+        source,
+        payload.get("imdbId") or payload.get("MetaIMDB"),
+        modules.json.encode_str(payload),
+        event_key(payload)
+    )
+
+
+def store_json(source: str, payload: dict) -> int:
+    """
+    Insert one event. Returns its row id, or None if it was a duplicate.
+    """
     logger.debug(f"Storing payload from source '{source}' with timestamp {payload.get('timestamp')}")
     with sqlite3.connect(DB_PATH) as conn:
         cursor = conn.cursor()
         cursor.execute("""
-            INSERT INTO events (timestamp, source, imdb_id, payload)
-            VALUES (?, ?, ?, ?)
-        """, (
-            payload.get("timestamp"),
-            source,
-            payload.get("imdbId"),
-            json.dumps(payload)
-        ))
+            INSERT OR IGNORE INTO events (timestamp, source, imdb_id, payload, dedup_key)
+            VALUES (?, ?, ?, ?, ?)
+        """, event_row(source, payload))
         conn.commit()
     logger.debug("Payload stored successfully")
+    return cursor.lastrowid if cursor.rowcount else None
+
+
+def event_seen(dedup_key: str) -> bool:
+    if not dedup_key:
+        return False
+    with sqlite3.connect(DB_PATH) as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1 FROM events WHERE dedup_key = ? LIMIT 1", (dedup_key,))
+        return cursor.fetchone() is not None
+
+
+def store_many(rows: list) -> int:
+    """
+    Insert prepared event rows in one transaction. Rows whose dedup_key
+    already exists are skipped. Returns the number inserted.
+    """
+    with sqlite3.connect(DB_PATH) as conn:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        before = conn.total_changes
+        conn.executemany("""
+            INSERT OR IGNORE INTO events (timestamp, source, imdb_id, payload, dedup_key)
+            VALUES (?, ?, ?, ?, ?)
+        """, rows)
+        conn.commit()
+        inserted = conn.total_changes - before
+    logger.debug(f"Bulk stored {inserted} of {len(rows)} rows")
+    return inserted
+
+
+def store_batch(rows: list) -> list:
+    """
+    Insert prepared event rows in one transaction, one statement each.
+    Returns the row id of every row, or None where it was a duplicate.
+    """
+    ids = []
+    with sqlite3.connect(DB_PATH) as conn:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        for row in rows:
+            cursor = conn.execute("""
+                INSERT OR IGNORE INTO events (timestamp, source, imdb_id, payload, dedup_key)
+                VALUES (?, ?, ?, ?, ?)
+            """, row)
+            ids.append(cursor.lastrowid if cursor.rowcount else None)
+        conn.commit()
+    logger.debug(f"Batch stored {sum(i is not None for i in ids)} of {len(rows)} rows")
+    return ids
 
 
 # ============================== Fetch ====================================
@@ -72,7 +172,109 @@ def fetch_json(limit: int = 250) -> list:
         cursor.execute("SELECT payload FROM events ORDER BY id DESC LIMIT ?", (limit,))
         rows = cursor.fetchall()
     logger.debug(f"Fetched {len(rows)} payloads")
-    return [json.loads(row[0]) for row in rows]
+    return [modules.json.decode(row[0]) for row in rows]
+
+# ============================== Timeline ====================================
+
+def store_timeline(rows: list):
+    """
+    Insert (event_id, seq, stage, offset_ms, started_at) rows in one transaction.
+    """
+    with sqlite3.connect(DB_PATH) as conn:
+        conn.executemany("""
+            INSERT OR REPLACE INTO event_timeline (event_id, seq, stage, offset_ms, started_at)
+            VALUES (?, ?, ?, ?, ?)
+        """, rows)
+        conn.commit()
+    logger.debug(f"Stored {len(rows)} timeline rows")
+
+
+def fetch_timeline(events: int = 1000) -> list:
+    """
+    Timeline rows for the most recent `events` events, ordered by event then seq.
+    """
+    with sqlite3.connect(DB_PATH) as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT event_id, seq, stage, offset_ms, started_at FROM event_timeline
+            WHERE event_id IN (
+                SELECT event_id FROM event_timeline WHERE seq = 0
+                ORDER BY started_at DESC LIMIT ?
+            )
+            ORDER BY event_id, seq
+        """, (events,))
+        return cursor.fetchall()
+
+# ============================== Resolution Cache ====================================
+
+def cache_get(title: str, year: int, now: float) -> dict:
+    """
+    Return the cached resolution for (title, year), or None if absent or expired.
+    A hit with imdb_id and tmdb_id both None is a cached miss.
+    """
+    with sqlite3.connect(DB_PATH) as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT imdb_id, tmdb_id FROM resolution_cache WHERE title = ? AND year = ? AND expires_at > ?",
+            (title, year, now)
+        )
+        row = cursor.fetchone()
+    if row is None:
+        return None
+    return {"imdb_id": row[0], "tmdb_id": row[1]}
+
+
+def cache_put(title: str, year: int, imdb_id: str, tmdb_id: int, expires_at: float):
+    logger.debug(f"Caching resolution for '{title}' ({year}): {imdb_id or 'miss'}")
+    with sqlite3.connect(DB_PATH) as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT OR REPLACE INTO resolution_cache (title, year, imdb_id, tmdb_id, expires_at)
+            VALUES (?, ?, ?, ?, ?)
+        """, (title, year, imdb_id, tmdb_id, expires_at))
+        conn.commit()
+
+
+# ============================== Change Feed ====================================
+
+FEED_COLUMNS = ("id", "timestamp", "title", "indexer", "resolution", "size")
+
+_FEED_SELECT = """
+    SELECT id, timestamp,
+           json_extract(payload, '$.TorrentName'),
+           json_extract(payload, '$.Indexer'),
+           json_extract(payload, '$.Resolution'),
+           json_extract(payload, '$.Size')
+    FROM events
+"""
+
+
+def fetch_events_since(since_id: int, limit: int = 500) -> list:
+    """
+    Compact rows (see FEED_COLUMNS) for events with id > since_id, oldest first.
+    Only the listed fields are pulled out of the payload.
+    """
+    with sqlite3.connect(DB_PATH) as conn:
+        cursor = conn.cursor()
+        cursor.execute(_FEED_SELECT + " WHERE id > ? ORDER BY id LIMIT ?", (since_id, limit))
+        return [dict(zip(FEED_COLUMNS, row)) for row in cursor.fetchall()]
+
+
+def fetch_events_latest(limit: int = 100) -> list:
+    """
+    The newest `limit` events as compact rows, newest first.
+    """
+    with sqlite3.connect(DB_PATH) as conn:
+        cursor = conn.cursor()
+        cursor.execute(_FEED_SELECT + " ORDER BY id DESC LIMIT ?", (limit,))
+        return [dict(zip(FEED_COLUMNS, row)) for row in cursor.fetchall()]
+
+
+def last_event_id() -> int:
+    with sqlite3.connect(DB_PATH) as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM events")
+        return cursor.fetchone()[0]
 
 # ====== Nothing to see here =========================
 
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+
+# =============================================================================
+# File: debug.py
+# Purpose: On-demand profiling and memory snapshots for the live server
+# Author: Joshua
+# Created: 2025-10-02
+# =============================================================================
+
+__version__ = "v0.1.0-beta"
+
+# ============================== Imports ======================================
+
+import asyncio
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from modules.Jaylog import mklog
+
+# ============================== Logger =======================================
+
+logger = mklog(__name__, level="DEBUG", logfile="../logs/debug.log")
+
+# ============================== Limits =======================================
+# Captures are capped so a stray request can't leave a profiler running.
+
+MAX_SECONDS = 60.0
+MIN_INTERVAL = 0.001
+MAX_SNAPSHOTS = 5
+TRACE_FRAMES = 10
+TRACE_SECONDS = 300.0     # tracemalloc stops this long after the last snapshot
+
+# One capture at a time; a second request gets a "busy" error.
+_capture_lock = threading.Lock()
+
+_snapshots = {}
+_snapshot_seq = 0
+_trace_lock = threading.Lock()
+_trace_timer = None
+
+
+class DebugBusyError(RuntimeError):
+    """Raised when a capture is already running."""
+
+
+#===================================================================
+#      Sampling Profiler
+#===================================================================
+
+def _collapse(frame) -> str:
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(stack))
+
+
+def _sample(seconds: float, interval: float) -> Counter:
+    stacks = Counter()
+    me = threading.get_ident()
+    names = {t.ident: t.name for t in threading.enumerate()}
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        for ident, frame in sys._current_frames().items():
+            if ident != me:
+                stacks[f"{names.get(ident, ident)};{_collapse(frame)}"] += 1
+        time.sleep(interval)
+    return stacks
+
+
+async def sample_profile(seconds: float, interval: float = 0.005) -> str:
+    """
+    Sample every thread's stack for `seconds` from a side thread and return
+    collapsed stacks ("thread;outer;...;inner count"), ready for flamegraph.pl
+    or speedscope. The event loop keeps serving while this runs.
+    """
+    seconds = min(max(seconds, 0.1), MAX_SECONDS)
+    interval = max(interval, MIN_INTERVAL)
+    if not _capture_lock.acquire(blocking=False):
+        raise DebugBusyError("A capture is already running")
+    try:
+        logger.info(f"Sampling profile for {seconds:.1f}s every {interval * 1000:.1f}ms")
+        stacks = await asyncio.to_thread(_sample, seconds, interval)
+    finally:
+        _capture_lock.release()
+    return "\n".join(f"{stack} {count}" for stack, count in stacks.most_common()) + "\n"
+
+
+#===================================================================
+#      cProfile
+#===================================================================
+
+async def cprofile(seconds: float, sort: str = "cumulative", limit: int = 50) -> str:
+    """
+    Run cProfile on the event loop thread for `seconds` and return the
+    pstats report. Deterministic but heavier than sampling; keep it short.
+    """
+    seconds = min(max(seconds, 0.1), MAX_SECONDS)
+    if not _capture_lock.acquire(blocking=False):
+        raise DebugBusyError("A capture is already running")
+    profiler = cProfile.Profile()
+    try:
+        logger.info(f"cProfile capture for {seconds:.1f}s")
+        profiler.enable()
+        await asyncio.sleep(seconds)
+    finally:
+        profiler.disable()
+        _capture_lock.release()
+
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats(sort).print_stats(limit)
+    return out.getvalue()
+
+
+#===================================================================
+#      tracemalloc
+#===================================================================
+
+def _top(stats, limit: int) -> list:
+    return [
+        {
+            "site": str(stat.traceback[0]) if stat.traceback else "?",
+            "size_kb": round(stat.size / 1024, 1),
+            "count": stat.count,
+            **({"size_diff_kb": round(stat.size_diff / 1024, 1), "count_diff": stat.count_diff}
+               if hasattr(stat, "size_diff") else {}),
+        }
+        for stat in stats[:limit]
+    ]
+
+
+def _arm_trace_timer(seconds: float):
+    global _trace_timer
+    if _trace_timer is not None:
+        _trace_timer.cancel()
+    _trace_timer = threading.Timer(seconds, _trace_expired)
+    _trace_timer.daemon = True
+    _trace_timer.start()
+
+
+def _trace_expired():
+    with _trace_lock:
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+            logger.info("tracemalloc stopped after idle timeout; snapshots kept for diffing")
+
+
+def take_snapshot(limit: int = 25, seconds: float = TRACE_SECONDS) -> dict:
+    """
+    Start tracing on first use, then snapshot and return the top allocation
+    sites. Tracing stops on its own `seconds` after the last snapshot; the
+    last few snapshots are kept for diffing.
+    """
+    global _snapshot_seq
+    seconds = min(max(seconds, 1.0), TRACE_SECONDS)
+    with _trace_lock:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACE_FRAMES)
+            logger.info("tracemalloc started; first snapshot only covers allocations from now on")
+
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        current, peak = tracemalloc.get_traced_memory()
+        _snapshot_seq += 1
+        _snapshots[_snapshot_seq] = snapshot
+        while len(_snapshots) > MAX_SNAPSHOTS:
+            del _snapshots[min(_snapshots)]
+        _arm_trace_timer(seconds)
+
+    return {
+        "id": _snapshot_seq,
+        "traced_kb": round(current / 1024, 1),
+        "peak_kb": round(peak / 1024, 1),
+        "tracing_for_s": seconds,
+        "top": _top(snapshot.statistics("lineno"), limit),
+    }
+
+
+def diff_snapshots(first: int, second: int, limit: int = 25) -> dict:
+    if first not in _snapshots or second not in _snapshots:
+        raise KeyError(f"Unknown snapshot; have {sorted(_snapshots)}")
+    stats = _snapshots[second].compare_to(_snapshots[first], "lineno")
+    return {"from": first, "to": second, "top": _top(stats, limit)}
+
+
+def stop_tracing():
+    global _trace_timer
+    with _trace_lock:
+        if _trace_timer is not None:
+            _trace_timer.cancel()
+            _trace_timer = None
+        _snapshots.clear()
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+            logger.info("tracemalloc stopped")
+
+
+#===================================================================
+#      asyncio Tasks
+#===================================================================
+
+def dump_tasks(limit: int = 20) -> str:
+    """
+    Stack of every pending asyncio task on the running loop.
+    """
+    out = io.StringIO()
+    tasks = asyncio.all_tasks()
+    out.write(f"{len(tasks)} tasks\n\n")
+    for task in sorted(tasks, key=lambda t: t.get_name()):
+        task.print_stack(limit=limit, file=out)
+        out.write("\n")
+    return out.getvalue()
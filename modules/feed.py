@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+
+# =============================================================================
+# File: feed.py
+# Purpose: Change feed of newly stored events for the live dashboard
+# Author: Joshua
+# Created: 2025-10-02
+# =============================================================================
+
+__version__ = "v0.1.0-beta"
+
+# ============================== Imports ======================================
+
+import asyncio
+import modules.db
+from modules.Jaylog import mklog
+
+# ============================== Logger =======================================
+
+logger = mklog(__name__, level="DEBUG", logfile="../logs/feed.log")
+
+# ============================== Constants ====================================
+
+BACKLOG_LIMIT = 500      # rows replayed to a (re)connecting client
+QUEUE_LIMIT = 1000       # a subscriber this far behind is dropped and must resume
+POLL_SECONDS = 15.0      # also catches writes from other processes (e.g. --import-dir)
+
+#===================================================================
+#      Feed
+#===================================================================
+
+class EventFeed:
+    """
+    One broadcaster reads new rows from the events table and fans them
+    out to every subscriber, so N open dashboards cost one query per
+    change instead of N page renders.
+    """
+
+    def __init__(self):
+        self.subscribers = set()
+        self.loop = None
+        self.wakeup = None
+        self.task = None
+        self.ready = None
+        self.last_id = 0
+
+    def notify(self):
+        """
+        Called after a write (from any thread) to wake the broadcaster.
+        """
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.wakeup.set)
+
+    def _start(self):
+        # Synchronous, so concurrent subscribers cannot both see no task
+        # and start a second broadcaster.
+        self.loop = asyncio.get_running_loop()
+        self.wakeup = asyncio.Event()
+        self.ready = asyncio.Event()
+        self.task = asyncio.create_task(self._broadcast())
+
+    async def _broadcast(self):
+        while not self.ready.is_set():
+            try:
+                self.last_id = await asyncio.to_thread(modules.db.last_event_id)
+                self.ready.set()
+            except Exception as e:
+                logger.warning(f"Event feed start failed: {e}")
+                await asyncio.sleep(POLL_SECONDS)
+        logger.debug(f"Event feed started at id {self.last_id}")
+
+        while True:
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self.wakeup.clear()
+            try:
+                await self._fan_out()
+            except Exception as e:
+                # A failed query must not end the feed; retry on the next wakeup or poll.
+                logger.warning(f"Event feed broadcast failed: {e}")
+
+    async def _fan_out(self):
+        if not self.subscribers:
+            self.last_id = await asyncio.to_thread(modules.db.last_event_id)
+            return
+
+        rows = await asyncio.to_thread(modules.db.fetch_events_since, self.last_id, BACKLOG_LIMIT)
+        while rows:
+            self.last_id = rows[-1]["id"]
+            for queue in list(self.subscribers):
+                for row in rows:
+                    try:
+                        queue.put_nowait(row)
+                    except asyncio.QueueFull:
+                        self.subscribers.discard(queue)
+                        queue.overflowed = True
+                        break
+            if len(rows) < BACKLOG_LIMIT:
+                break
+            rows = await asyncio.to_thread(modules.db.fetch_events_since, self.last_id, BACKLOG_LIMIT)
+
+    async def subscribe(self, since_id: int):
+        """
+        Yield compact event rows with id > since_id, then live ones as they
+        are stored. Yields None periodically as a keepalive. Ends if the
+        subscriber falls too far behind; the client resumes from its last id.
+        """
+        if self.task is None or self.task.done():
+            self._start()
+        await self.ready.wait()
+
+        queue = asyncio.Queue(QUEUE_LIMIT)
+        queue.overflowed = False
+        self.subscribers.add(queue)
+        try:
+            sent = since_id
+            while True:
+                backlog = await asyncio.to_thread(modules.db.fetch_events_since, sent, BACKLOG_LIMIT)
+                for row in backlog:
+                    sent = row["id"]
+                    yield row
+                if len(backlog) < BACKLOG_LIMIT:
+                    break
+
+            while not queue.overflowed or not queue.empty():
+                try:
+                    row = await asyncio.wait_for(queue.get(), POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if row["id"] > sent:
+                    sent = row["id"]
+                    yield row
+        finally:
+            self.subscribers.discard(queue)
+
+
+feed = EventFeed()
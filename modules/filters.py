@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+
+# =============================================================================
+# File: filters.py
+# Purpose: Accept/reject decisions for Autobrr releases
+# Author: Joshua
+# Created: 2025-10-02
+# =============================================================================
+
+__version__ = "v0.1.0-beta"
+
+# ============================== Imports ======================================
+
+import re
+from modules.Jaylog import mklog
+
+# ============================== Logger =======================================
+
+logger = mklog(__name__, level="DEBUG", logfile="../logs/filters.log")
+
+# ============================== Constants ====================================
+
+VIDEO_EXTENSIONS = (".mkv", ".mp4", ".avi", ".m2ts", ".ts", ".wmv", ".mov")
+
+EPISODE_PATTERN = re.compile(r"\bS\d{1,2}E\d{1,3}\b", re.IGNORECASE)
+SAMPLE_PATTERN = re.compile(r"(^|[/._\- ])sample([/._\- ]|$)", re.IGNORECASE)
+
+#===================================================================
+#      File List Rules
+#===================================================================
+
+def _video_files(files: list) -> list:
+    return [f for f in files if f["path"].lower().endswith(VIDEO_EXTENSIONS)]
+
+
+def is_season_pack(files: list) -> bool:
+    """
+    True when more than one video file carries an SxxEyy tag.
+    """
+    episodes = {m.group(0).upper() for f in _video_files(files) for m in [EPISODE_PATTERN.search(f["path"])] if m}
+    return len(episodes) > 1
+
+
+def is_sample_only(files: list) -> bool:
+    """
+    True when every video file in the torrent is a sample.
+    """
+    videos = _video_files(files)
+    return bool(videos) and all(SAMPLE_PATTERN.search(f["path"]) for f in videos)
+
+
+#===================================================================
+#      Check
+#===================================================================
+
+def check(payload: dict, filters: dict, torrent: dict = None) -> dict:
+    """
+    Run a payload through the configured filters.
+    `torrent` is the optional output of bencode.torrent_info(); file-list
+    rules are skipped without it.
+    Returns {"status": "accepted"} or {"status": "rejected", "reason": ...}.
+    """
+    min_seeders = filters.get("min_seeders", 0)
+    seeders = payload.get("Seeders")
+    if seeders is not None and seeders < min_seeders:
+        return _reject(payload, f"Seeders {seeders} below minimum {min_seeders}")
+
+    quality = filters.get("quality", [])
+    resolution = payload.get("Resolution")
+    if quality and resolution and resolution not in quality:
+        return _reject(payload, f"Resolution {resolution} not in {quality}")
+
+    if torrent:
+        if filters.get("reject_season_packs", True) and is_season_pack(torrent["files"]):
+            return _reject(payload, "Season pack")
+        if filters.get("reject_samples", True) and is_sample_only(torrent["files"]):
+            return _reject(payload, "Sample-only release")
+
+    logger.debug(f"Accepted: {payload.get('TorrentName')}")
+    return {"status": "accepted"}
+
+
+def _reject(payload: dict, reason: str) -> dict:
+    logger.info(f"Rejected {payload.get('TorrentName')}: {reason}")
+    return {"status": "rejected", "reason": reason}
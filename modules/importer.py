@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+
+# =============================================================================
+# File: importer.py
+# Purpose: Bulk import of archived autobrr_event_*.json files into SQLite
+# Author: Joshua
+# Created: 2025-10-02
+# =============================================================================
+
+__version__ = "v0.1.0-beta"
+
+# ============================== Imports ======================================
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import modules.db
+import modules.json
+import modules.models
+import modules.release
+from modules.Jaylog import mklog
+
+# ============================== Logger =======================================
+
+logger = mklog(__name__, level="DEBUG", logfile="../logs/importer.log")
+
+# ============================== Constants ====================================
+
+PREFIX = "autobrr_event_"
+SUFFIX = ".json"
+
+CHUNK = 500          # files per worker task
+BATCH = 20000        # rows per SQLite transaction
+
+#===================================================================
+#      Normalize (runs in worker processes)
+#===================================================================
+
+def normalize(raw: dict, timestamp: str) -> dict:
+    """
+    Map an archived event onto AutoBRRPayload (which coerces legacy keys
+    and string fields) and fill it the same way live intake does.
+    """
+    payload = modules.models.AutoBRRPayload(**raw).model_dump(exclude_none=True)
+    modules.release.normalize_payload(payload)
+    payload["timestamp"] = timestamp
+    return payload
+
+
+def _load_chunk(paths: list) -> list:
+    rows = []
+    for path in paths:
+        name = os.path.basename(path)
+        try:
+            with open(path, "rb") as f:
+                raw = modules.json.decode(f.read())
+            payload = normalize(raw, name[len(PREFIX):-len(SUFFIX)])
+            rows.append((name, modules.db.event_row("autobrr", payload), None))
+        except Exception as e:
+            rows.append((name, None, str(e)))
+    return rows
+
+
+#===================================================================
+#      Checkpoint
+#===================================================================
+
+def load_checkpoint(path: str) -> dict:
+    if not path or not os.path.isfile(path):
+        return {}
+    return modules.json.load(path)
+
+
+def save_checkpoint(path: str, state: dict):
+    modules.json.dump(state, path, indent=None)
+
+
+#===================================================================
+#      Import
+#===================================================================
+
+def scan(directory: str, after: str = None) -> list:
+    """
+    Sorted archive file names in a directory, optionally only those after a checkpoint.
+    """
+    names = sorted(
+        entry.name for entry in os.scandir(directory)
+        if entry.is_file() and entry.name.startswith(PREFIX) and entry.name.endswith(SUFFIX)
+    )
+    if after:
+        names = [n for n in names if n > after]
+    return names
+
+
+def import_dir(directory: str, checkpoint: str = None, workers: int = None) -> dict:
+    """
+    Parse every archived event in `directory` across a process pool and
+    bulk-insert into the events table. Progress is checkpointed after each
+    committed batch, so an interrupted run picks up where it stopped.
+    """
+    checkpoint = checkpoint or os.path.join(directory, ".import_checkpoint.json")
+    state = load_checkpoint(checkpoint)
+    state.setdefault("files", 0)
+    state.setdefault("inserted", 0)
+    state.setdefault("errors", 0)
+
+    names = scan(directory, after=state.get("last"))
+    logger.info(f"Importing {len(names)} files from {directory}"
+                + (f" (resuming after {state['last']})" if state.get("last") else ""))
+
+    modules.db.init()
+    chunks = [[os.path.join(directory, n) for n in names[i:i + CHUNK]] for i in range(0, len(names), CHUNK)]
+
+    start = time.perf_counter()
+    done = 0
+    batch = []
+    last = None
+
+    def flush():
+        nonlocal batch
+        if batch:
+            state["inserted"] += modules.db.store_many(batch)
+            batch = []
+        state["last"] = last
+        save_checkpoint(checkpoint, state)
+        rate = done / max(time.perf_counter() - start, 1e-9)
+        logger.info(f"{done}/{len(names)} files, {state['inserted']} inserted, {rate:,.0f} files/sec")
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for results in pool.map(_load_chunk, chunks):
+            for name, row, error in results:
+                if error:
+                    state["errors"] += 1
+                    logger.warning(f"Skipping {name}: {error}")
+                else:
+                    batch.append(row)
+                last = name
+            done += len(results)
+            state["files"] += len(results)
+            if len(batch) >= BATCH:
+                flush()
+
+    if last is not None:
+        flush()
+
+    elapsed = time.perf_counter() - start
+    summary = {
+        "files": state["files"],
+        "inserted": state["inserted"],
+        "errors": state["errors"],
+        "seconds": round(elapsed, 2),
+        "files_per_sec": round(done / elapsed, 1) if elapsed else 0.0,
+    }
+    logger.info(f"Import finished: {summary}")
+    return summary
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+
+# =============================================================================
+# File: instances.py
+# Purpose: Multiple Radarr/qBittorrent instances with routing and balancing
+# Author: Joshua
+# Created: 2025-10-02
+# =============================================================================
+
+__version__ = "v0.1.0-beta"
+
+# ============================== Imports ======================================
+
+import asyncio
+import fnmatch
+import httpx
+import modules.config
+import modules.models
+import modules.scheduler
+from modules.Jaylog import mklog
+
+# ============================== Logger =======================================
+
+logger = mklog(__name__, level="DEBUG", logfile="../logs/instances.log")
+
+# ============================== Routing ======================================
+# "match" keys in config.json and the payload field each one tests.
+
+MATCH_FIELDS = modules.models.MATCH_FIELDS
+
+
+class NoInstanceError(modules.scheduler.CircuitOpenError):
+    """Raised when no configured instance of a service can take a call."""
+
+
+#===================================================================
+#      Instance
+#===================================================================
+
+class Instance:
+    """
+    One configured server. Owns its connection pool and its upstream
+    guard (rate limit, concurrency, breaker), so a slow or failing box
+    does not affect its siblings.
+    """
+
+    def __init__(self, service: str, settings: dict):
+        self.service = service
+        self.name = settings.get("name", "default")
+        self.key = f"{service}:{self.name}"
+        self.settings = settings
+        self.host = settings.get("host")
+        checked = modules.models.InstanceSettings(**settings)   # ValueError on unknown match keys
+        self.match = {k: [p.lower() for p in v] for k, v in checked.match.items()}
+        self.upstream = modules.scheduler.upstream(self.key)
+        self.outstanding = 0
+        self.client = None
+        self.logged_in = False     # qBittorrent session cookie lives on the client
+
+    def session(self) -> httpx.AsyncClient:
+        if self.client is None:
+            self.client = httpx.AsyncClient(base_url=self.host, timeout=self.settings.get("timeout", 10))
+        return self.client
+
+    def matches(self, payload: dict) -> bool:
+        for key, patterns in self.match.items():
+            value = str(payload.get(MATCH_FIELDS[key]) or "").lower()
+            if not any(fnmatch.fnmatchcase(value, p) for p in patterns):
+                return False
+        return True
+
+    def healthy(self) -> bool:
+        return self.upstream.breaker.available()
+
+    async def call(self, func, *args, **kwargs):
+        """
+        Run func(*args, instance=self) through this instance's guard.
+        """
+        self.outstanding += 1
+        try:
+            return await self.upstream.call(func, *args, instance=self, **kwargs)
+        finally:
+            self.outstanding -= 1
+
+    def status(self) -> dict:
+        return {
+            "host": self.host,
+            "state": self.upstream.breaker.state,
+            "outstanding": self.outstanding,
+        }
+
+
+_instances = {}
+
+
+def instances(service: str) -> list:
+    """
+    Every configured instance of a service, in config order.
+    A section may list "instances" or, as before, be a single host.
+    """
+    if service not in _instances:
+        section = modules.config.config.get(service, {})
+        entries = modules.models.instance_entries(section)
+        _instances[service] = [Instance(service, entry) for entry in entries]
+        logger.info(f"{service}: {', '.join(i.name for i in _instances[service]) or 'no instances'}")
+    return _instances[service]
+
+
+def route(service: str, payload: dict = None) -> list:
+    """
+    Instances whose rules match the payload. Instances without rules are
+    the fallback when no rule matches. No payload means all instances.
+    """
+    every = instances(service)
+    if payload is None:
+        return list(every)
+    ruled = [i for i in every if i.match and i.matches(payload)]
+    return ruled or [i for i in every if not i.match]
+
+
+def pick(service: str, payload: dict = None) -> Instance:
+    """
+    The routed instance with the fewest outstanding requests, skipping
+    instances whose breaker is open.
+    """
+    candidates = route(service, payload)
+    healthy = [i for i in candidates if i.healthy()]
+    if not healthy:
+        names = ", ".join(i.name for i in candidates) or "none routed"
+        retry_after = min((i.upstream.breaker.retry_after() for i in candidates), default=0.0)
+        raise NoInstanceError(f"No available {service} instance ({names})", retry_after)
+    return min(healthy, key=lambda i: i.outstanding)
+
+
+async def fan_out(service: str, func, *args, payload: dict = None) -> list:
+    """
+    Call func on every routed instance at once.
+    Returns [(instance, result or exception)] in config order.
+    """
+    targets = route(service, payload)
+    results = await asyncio.gather(*(i.call(func, *args) for i in targets), return_exceptions=True)
+    return list(zip(targets, results))
+
+
+def status() -> dict:
+    return {
+        service: {i.name: i.status() for i in group}
+        for service, group in _instances.items()
+    }
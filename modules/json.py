@@ -5,19 +5,112 @@
 # Created: 2025-10-02
 # =============================================================================
 
-__version__ = "v0.1.0-beta"
+__version__ = "v0.2.0-beta"
 
 # ============================== Imports ======================================
+import codecs
 import json
 import httpx
 import os
+import re
+import stat
+import tempfile
+import time
 from typing import Any
-import modules.Jaylog
+from modules.Jaylog import mklog
 # ============================== Logger =======================================
 
 logger = mklog(__name__, level="DEBUG", logfile="../logs/json.log")
 logger.debug("Initialized JSON logger at ../logs/json.log")
 
+#===================================================================
+#      Codec Backend
+#===================================================================
+# Fastest available wins: orjson, then msgspec, then the stdlib.
+# encode()/decode() are the hot path (storage, segment log, feed) and
+# work in bytes; they do not log.
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+class DecodeError(ValueError):
+    """Raised for malformed JSON whichever backend is active."""
+
+
+def _std_encode(data: Any) -> bytes:
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _std_pretty(data: Any) -> bytes:
+    return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+if orjson is not None:
+    BACKEND = "orjson"
+    _encode = orjson.dumps
+    _decode = orjson.loads
+    _decode_errors = (orjson.JSONDecodeError,)
+
+    def _pretty(data: Any) -> bytes:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+
+elif msgspec is not None:
+    BACKEND = "msgspec"
+    _encode = msgspec.json.encode
+    _decode = msgspec.json.decode
+    _decode_errors = (msgspec.DecodeError,)
+
+    def _pretty(data: Any) -> bytes:
+        return msgspec.json.format(msgspec.json.encode(data), indent=2)
+
+else:
+    BACKEND = "json"
+    _encode = _std_encode
+    _decode = json.loads
+    _decode_errors = (json.JSONDecodeError, UnicodeDecodeError)
+    _pretty = _std_pretty
+
+logger.debug(f"JSON codec backend: {BACKEND}")
+
+
+def encode(data: Any) -> bytes:
+    """
+    Compact UTF-8 JSON bytes. Falls back to the stdlib for values the fast
+    backend rejects (e.g. non-str keys, ints over 64 bits).
+    """
+    try:
+        return _encode(data)
+    except TypeError:
+        return _std_encode(data)
+
+
+def decode(data) -> Any:
+    """
+    Parse JSON from bytes, bytearray, memoryview or str.
+    """
+    try:
+        return _decode(data)
+    except _decode_errors as e:
+        raise DecodeError(str(e)) from e
+    except TypeError:
+        # stdlib json.loads does not take memoryview
+        return decode(bytes(data))
+
+
+def encode_str(data: Any) -> str:
+    """
+    Compact JSON as str, for TEXT columns and log lines.
+    """
+    return encode(data).decode("utf-8")
+
 #===================================================================
 #      Exists?
 #===================================================================
@@ -34,10 +127,10 @@ def exists(path: str) -> bool:
 
 def validate_json(text: str) -> bool:
     try:
-        json.loads(text)
+        decode(text)
         logger.debug(f"JSON passes validation")
         return True
-    except json.JSONDecodeError:
+    except DecodeError:
         logger.error(f"JSON FAILED validation")
         return False
 
@@ -50,8 +143,8 @@ def load(path: str) -> Any:
     """
     Load JSON from file and return native Python object.
     """
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    with open(path, "rb") as f:
+        data = decode(f.read())
     logger.debug(f"Loaded JSON from {path}")
     return data
 
@@ -59,12 +152,35 @@ def load(path: str) -> Any:
 #      Dump
 #===================================================================
 
+def _file_mode(path: str) -> int:
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
 def dump(data: Any, path: str, indent: int = 2):
     """
-    Write Python object to file as JSON.
+    Write Python object to file as JSON, atomically: readers see either
+    the old file or the complete new one, never a partial write.
+    Pass indent=None for compact output.
     """
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=indent)
+    body = stringify(data, indent).encode("utf-8") if indent else encode(data)
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix=".tmp-", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(body)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates 0600; keep the replaced file's mode, or what open() would give
+        os.chmod(tmp, _file_mode(path))
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
     logger.debug(f"Dumped JSON to {path}")
 
 #===================================================================
@@ -75,9 +191,7 @@ def parse(text: str) -> Any:
     """
     Parse JSON string into Python object.
     """
-    result = json.loads(text)
-    logger.debug("Parsed JSON string")
-    return result
+    return decode(text)
 
 #===================================================================
 #      Stringify
@@ -85,11 +199,188 @@ def parse(text: str) -> Any:
 
 def stringify(data: Any, indent: int = 2) -> str:
     """
-    Convert Python object to JSON string.
+    Convert Python object to JSON string. indent=None gives compact output.
     """
-    result = json.dumps(data, indent=indent)
-    logger.debug("Stringified Python object to JSON")
-    return result
+    if not indent:
+        return encode_str(data)
+    if indent == 2:
+        try:
+            return _pretty(data).decode("utf-8")
+        except TypeError:
+            pass
+    return json.dumps(data, indent=indent, ensure_ascii=False)
+
+#===================================================================
+#      Stream
+#===================================================================
+
+MAX_RECORD_BYTES = 1024 * 1024
+_WHITESPACE = " \t\r\n"
+
+# Strings (group 1 is None when the buffer ends inside one), brackets and commas.
+_STRUCTURE = re.compile(r'"(?:[^"\\]|\\.)*(")?|[\[\]{},]')
+
+
+def _element_end(buffer: str, pos: int) -> int:
+    """
+    Index of the "," or "]" that ends the array element starting at `pos`,
+    found lexically so a malformed record can be skipped. -1 if the
+    buffer ends first.
+    """
+    depth = 0
+    for match in _STRUCTURE.finditer(buffer, pos):
+        token = match.group()
+        if token[0] == '"':
+            if match.group(1) is None:
+                return -1
+        elif token in "[{":
+            depth += 1
+        elif token == ",":
+            if not depth:
+                return match.start()
+        elif depth:
+            depth -= 1
+        elif token == "]":
+            return match.start()
+    return -1
+
+
+def _scan_array(buffer: str, expect: str, final: bool) -> tuple:
+    """
+    Consume as much of a JSON array body as can be decided.
+    `expect` is the parser state: "first" (record or "]"), "value" (record),
+    "separator" ("," or "]"), "end" (only whitespace), "error" (stop).
+    Returns ([(record, error)], position consumed up to, new state).
+    """
+    decoder = _array_decoder
+    out = []
+    pos = 0
+    size = len(buffer)
+    while True:
+        while pos < size and buffer[pos] in _WHITESPACE:
+            pos += 1
+        if pos == size:
+            return out, pos, expect
+        char = buffer[pos]
+
+        if expect == "end":
+            out.append((None, "Unexpected data after JSON array"))
+            return out, size, "error"
+
+        if expect == "separator":
+            pos += 1
+            if char == ",":
+                expect = "value"
+            elif char == "]":
+                expect = "end"
+            else:
+                # Missing comma: report the stray record and resync on the next separator.
+                end = _element_end(buffer, pos - 1)
+                if end < 0 and not final:
+                    return out, pos - 1, expect
+                end = size if end < 0 else end
+                out.append((None, f"Expected ',' or ']' before {buffer[pos - 1:end].strip()[:40]!r}"))
+                pos = end
+            continue
+
+        if char == "]":
+            if expect == "value":
+                out.append((None, "Trailing ',' before ']'"))
+            pos += 1
+            expect = "end"
+            continue
+        if char == ",":
+            out.append((None, "Empty record between ','"))
+            pos += 1
+            expect = "value"
+            continue
+
+        try:
+            record, end = decoder.raw_decode(buffer, pos)
+            if end == size and not final:
+                return out, pos, expect    # a number or literal may continue
+            out.append((record, None))
+            pos = end
+        except json.JSONDecodeError as e:
+            end = _element_end(buffer, pos)
+            if end < 0:
+                if not final:
+                    return out, pos, expect    # incomplete; wait for more bytes
+                end = size
+            out.append((None, f"Invalid JSON: {e.msg}"))
+            pos = end
+        expect = "separator"
+
+
+_array_decoder = json.JSONDecoder()
+
+
+async def iter_records(chunks):
+    """
+    Incrementally parse a JSON array or NDJSON body from an async iterator
+    of byte chunks. Yields (index, record, error) as records complete;
+    only the unparsed tail is held in memory.
+    Errors are per record (per line for NDJSON): a malformed record, a
+    missing or doubled comma is reported and parsing carries on. Data
+    after the closing "]" ends the stream with an error.
+    """
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    mode = None        # "array" or "ndjson", decided by the first byte
+    state = "first"
+    index = 0
+
+    async for chunk in chunks:
+        buffer += text_decoder.decode(chunk)
+
+        if mode is None:
+            buffer = buffer.lstrip(_WHITESPACE)
+            if not buffer:
+                continue
+            mode = "array" if buffer[0] == "[" else "ndjson"
+            if mode == "array":
+                buffer = buffer[1:]
+
+        if mode == "ndjson":
+            *lines, buffer = buffer.split("\n")
+            for line in lines:
+                if line.strip():
+                    yield _decode_line(index, line)
+                    index += 1
+            if len(buffer) > MAX_RECORD_BYTES:
+                yield index, None, f"Record exceeds {MAX_RECORD_BYTES} bytes"
+                return
+            continue
+
+        found, pos, state = _scan_array(buffer, state, final=False)
+        for record, error in found:
+            yield index, record, error
+            index += 1
+        if state == "error":
+            return
+        buffer = buffer[pos:]
+        if len(buffer) > MAX_RECORD_BYTES:
+            yield index, None, f"Record exceeds {MAX_RECORD_BYTES} bytes"
+            return
+
+    buffer += text_decoder.decode(b"", final=True)
+    if mode == "ndjson" and buffer.strip():
+        yield _decode_line(index, buffer)
+    elif mode == "array":
+        found, _, state = _scan_array(buffer, state, final=True)
+        for record, error in found:
+            yield index, record, error
+            index += 1
+        if state not in ("end", "error"):
+            yield index, None, "Unterminated JSON array"
+
+
+def _decode_line(index: int, line: str) -> tuple:
+    try:
+        return index, decode(line), None
+    except DecodeError as e:
+        return index, None, f"Invalid JSON: {e}"
+
 
 #===================================================================
 #      Pretty
@@ -99,8 +390,7 @@ def pretty(data: Any):
     """
     Print JSON to console in readable format.
     """
-    print(json.dumps(data, indent=2))
-    logger.debug("Printed JSON to console")
+    print(stringify(data))
 
 
 #===================================================================
@@ -131,3 +421,46 @@ async def call_external_api(
         except httpx.HTTPError as e:
             logger.warning(f"API call failed: {e}")
             return {"error": str(e), "status_code": getattr(e.response, "status_code", None)}
+
+
+#===================================================================
+#      Benchmark
+#===================================================================
+
+def benchmark(count: int = 20000):
+    """
+    Encode/decode a full Autobrr webhook payload with the stdlib and the
+    active backend. Run with: python -m modules.json
+    """
+    payload = {
+        "TorrentName": "Prime.Minister.2025.1080p.WEB-DL.DDP5.1.H.264-FLUX",
+        "TorrentUrl": "https://reelflix.xyz/torrent/download/12345.abcdef",
+        "TorrentDataRawBytes": "ZDg6YW5ub3VuY2U" * 400,
+        "Indexer": "reelflix", "IndexerName": "ReelFliX", "IndexerIdentifier": "reelflix",
+        "FilterName": "RFx - Movies - 2025 - 1080p x264", "FilterID": 7,
+        "Size": 4788888535, "Seeders": 12, "Leechers": 3, "Freeleech": True,
+        "FreeleechPercent": 100, "Uploader": "FLUX", "Category": "Movies",
+        "Categories": ["Movies", "HD", "1080p"], "Tags": ["web-dl", "ddp"],
+        "Resolution": "1080p", "Source": "WEB-DL", "Codec": ["H.264"],
+        "Audio": ["DDP", "5.1"], "HDR": [], "Group": "FLUX", "Year": 2025,
+        "Description": "Prime Minister (2025) — " + "x" * 1500,
+        **{f"Field{n}": n for n in range(44)},
+    }
+    backends = [("json", _std_encode, json.loads)]
+    if BACKEND != "json":
+        backends.append((BACKEND, encode, decode))
+
+    for name, enc, dec in backends:
+        start = time.perf_counter()
+        for _ in range(count):
+            body = enc(payload)
+        encoded = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(count):
+            dec(body)
+        decoded = time.perf_counter() - start
+        print(f"{name:<8}: encode {count / encoded:>10,.0f}/sec   decode {count / decoded:>10,.0f}/sec")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+
+# =============================================================================
+# File: models.py
+# Purpose: Intake models shared by the webhook listener and the importer,
+#          and the per-instance settings model for config.json
+# Author: Joshua
+# Created: 2025-10-02
+# =============================================================================
+
+__version__ = "v0.1.0-beta"
+
+# ============================== Imports ======================================
+
+import modules.json
+from pydantic import BaseModel, ConfigDict, field_validator, model_validator
+from typing import Dict, List, Optional
+
+# ============================== Coercion =====================================
+
+# Older deployments (and the archive) wrote their own key names.
+LEGACY_KEYS = {
+    "releaseName": "TorrentName",
+    "indexer": "Indexer",
+    "TorrentURL": "TorrentUrl",
+    "IMDB": "MetaIMDB",
+    "imdbId": "MetaIMDB",
+    "Bytes": "Size",
+}
+
+# Autobrr macros render these lists as JSON strings ("[]", '["x264"]').
+LIST_FIELDS = ("Codec", "Audio", "Language", "Other", "Categories", "Bonus")
+
+# ============================== Models =======================================
+
+class AutoBRRPayload(BaseModel):
+    """
+    An Autobrr announce. Raw input is coerced first (see coerce), so the
+    webhook, the batch endpoint and the importer accept the same shapes.
+    """
+
+    @model_validator(mode="before")
+    @classmethod
+    def coerce(cls, data):
+        """
+        Human-readable Size ("4.8 GB") moves to SizeString, legacy key names
+        map onto current ones, and JSON-string list fields are decoded (a
+        plain string becomes a one-item list).
+        """
+        if not isinstance(data, dict):
+            return data
+        data = dict(data)
+        if isinstance(data.get("Size"), str):
+            data["SizeString"] = data.pop("Size")
+        for old, new in LEGACY_KEYS.items():
+            if old in data and not data.get(new):
+                data[new] = data.pop(old)
+        for key in LIST_FIELDS:
+            if isinstance(data.get(key), str):
+                try:
+                    data[key] = modules.json.decode(data[key])
+                except ValueError:
+                    data[key] = [data[key]]
+        return data
+
+    Artists: Optional[str] = None
+    Audio: Optional[List[str]] = None
+    AudioChannels: Optional[str] = None
+    AudioFormat: Optional[str] = None
+    Bitrate: Optional[str] = None
+    Bonus: Optional[List[str]] = None
+    Categories: Optional[List[str]] = None
+    Category: Optional[str] = None
+    Codec: Optional[List[str]] = None
+    Container: Optional[str] = None
+    CurrentDay: Optional[int] = None
+    CurrentHour: Optional[int] = None
+    CurrentMinute: Optional[int] = None
+    CurrentMonth: Optional[int] = None
+    CurrentSecond: Optional[int] = None
+    CurrentYear: Optional[int] = None
+    Day: Optional[int] = None
+    Description: Optional[str] = None
+    DownloadURL: Optional[str] = None
+    Episode: Optional[int] = None
+    FilterID: Optional[int] = None
+    FilterName: Optional[str] = None
+    Freeleech: Optional[bool] = None
+    FreeleechPercent: Optional[int] = None
+    Group: Optional[str] = None
+    GroupID: Optional[str] = None
+    HasCue: Optional[bool] = None
+    HasLog: Optional[bool] = None
+    HDR: Optional[str] = None
+    Implementation: Optional[str] = None
+    Indexer: Optional[str] = None
+    IndexerIdentifier: Optional[str] = None
+    IndexerIdentifierExternal: Optional[str] = None
+    IndexerName: Optional[str] = None
+    InfoUrl: Optional[str] = None
+    IsDuplicate: Optional[bool] = None
+    Language: Optional[List[str]] = None
+    Leechers: Optional[int] = None
+    LogScore: Optional[int] = None
+    MagnetURI: Optional[str] = None
+    MetaIMDB: Optional[str] = None
+    Month: Optional[int] = None
+    Origin: Optional[str] = None
+    Other: Optional[List[str]] = None
+    PreTime: Optional[str] = None
+    Proper: Optional[bool] = None
+    Protocol: Optional[str] = None
+    RecordLabel: Optional[str] = None
+    Region: Optional[str] = None
+    Repack: Optional[bool] = None
+    Resolution: Optional[str] = None
+    Season: Optional[int] = None
+    Seeders: Optional[int] = None
+    Size: Optional[int] = None
+    SizeString: Optional[str] = None
+    SkipDuplicateProfileID: Optional[int] = None
+    SkipDuplicateProfileName: Optional[str] = None
+    Source: Optional[str] = None
+    Tags: Optional[str] = None
+    Title: Optional[str] = None
+    TorrentDataRawBytes: Optional[str] = None
+    TorrentHash: Optional[str] = None
+    TorrentID: Optional[str] = None
+    TorrentName: Optional[str] = None
+    TorrentPathName: Optional[str] = None
+    TorrentTmpFile: Optional[str] = None
+    TorrentUrl: Optional[str] = None
+    Type: Optional[str] = None
+    Uploader: Optional[str] = None
+    Website: Optional[str] = None
+    Year: Optional[int] = None
+
+
+# ============================== Instances ====================================
+# "match" keys in config.json and the payload field each one tests.
+# Values are lists of case-insensitive glob patterns.
+
+MATCH_FIELDS = {
+    "resolution": "Resolution",
+    "filter": "FilterName",
+    "indexer": "Indexer",
+}
+
+
+class InstanceSettings(BaseModel):
+    """
+    One entry of a service's "instances" list. Service-specific keys
+    (apikey, username, ...) pass through untouched.
+    """
+    model_config = ConfigDict(extra="allow")
+
+    name: str = "default"
+    host: str
+    match: Dict[str, List[str]] = {}
+
+    @field_validator("match")
+    @classmethod
+    def known_match_keys(cls, match: dict) -> dict:
+        unknown = sorted(set(match) - set(MATCH_FIELDS))
+        if unknown:
+            raise ValueError(f"unknown match key(s) {', '.join(unknown)}; "
+                             f"expected one of {', '.join(MATCH_FIELDS)}")
+        return match
+
+
+def instance_entries(section: dict) -> list:
+    """
+    A service section's "instances" list or, as before, the section itself
+    as a single instance named "default" when it has a host.
+    """
+    return section.get("instances") or ([dict(section, name="default")] if section.get("host") else [])
@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+
+# =============================================================================
+# File: prefetch.py
+# Purpose: Speculative .torrent download and on-disk LRU cache by infohash
+# Author: Joshua
+# Created: 2025-10-02
+# =============================================================================
+
+__version__ = "v0.1.0-beta"
+
+# ============================== Imports ======================================
+
+import asyncio
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+import httpx
+import modules.bencode
+import modules.config
+from modules.Jaylog import mklog
+
+# ============================== Logger =======================================
+
+logger = mklog(__name__, level="DEBUG", logfile="../logs/prefetch.log")
+
+# ============================== Defaults =====================================
+# Overridden by the "prefetch" section of config.json.
+
+DEFAULTS = {
+    "enabled": True,
+    "path": "./cache/torrents",
+    "max_bytes": 256 * 1024 * 1024,   # cache size before LRU eviction
+    "timeout": 15.0,                  # seconds a grab waits on an in-flight fetch
+}
+
+MAX_TORRENT_BYTES = 20 * 1024 * 1024
+URL_INDEX_LIMIT = 10000
+URL_INDEX_FILE = "urls.idx"     # "<url>\t<infohash>" lines, newest last
+
+#===================================================================
+#      Cache
+#===================================================================
+
+class TorrentCache:
+    """
+    .torrent files stored as <infohash>.torrent, evicted least recently
+    used first once the directory exceeds `max_bytes`. Recency survives
+    restarts through file mtimes. A bounded index maps download URLs to
+    infohashes so retries find the file again; it is appended to
+    urls.idx and reloaded on start.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()   # infohash -> size, oldest first
+        self.urls = OrderedDict()      # url -> infohash
+        self.total = 0
+        os.makedirs(directory, exist_ok=True)
+
+        found = []
+        for name in os.listdir(directory):
+            if name.endswith(".torrent"):
+                st = os.stat(os.path.join(directory, name))
+                found.append((st.st_mtime, name[:-8], st.st_size))
+        for _, infohash, size in sorted(found):
+            self.entries[infohash] = size
+            self.total += size
+
+        self.index_path = os.path.join(directory, URL_INDEX_FILE)
+        self.index_lines = 0
+        self._load_index()
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    url, _, infohash = line.rstrip("\n").rpartition("\t")
+                    self.index_lines += 1
+                    if url and infohash in self.entries:
+                        self.urls[url] = infohash
+                        self.urls.move_to_end(url)
+        except FileNotFoundError:
+            return
+        while len(self.urls) > URL_INDEX_LIMIT:
+            self.urls.popitem(last=False)
+        if self.index_lines > 2 * URL_INDEX_LIMIT:
+            self._rewrite_index()
+
+    def _rewrite_index(self):
+        fd, tmp = tempfile.mkstemp(prefix=".tmp-", dir=self.directory)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.writelines(f"{url}\t{infohash}\n" for url, infohash in self.urls.items())
+        os.replace(tmp, self.index_path)
+        self.index_lines = len(self.urls)
+
+    def _path(self, infohash: str) -> str:
+        return os.path.join(self.directory, f"{infohash}.torrent")
+
+    def get(self, infohash: str) -> bytes:
+        with self.lock:
+            if infohash not in self.entries:
+                return None
+            self.entries.move_to_end(infohash)
+        path = self._path(infohash)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+            return data
+        except FileNotFoundError:
+            with self.lock:
+                self.total -= self.entries.pop(infohash, 0)
+            return None
+
+    def get_url(self, url: str) -> bytes:
+        with self.lock:
+            infohash = self.urls.get(url)
+        return infohash and self.get(infohash)
+
+    def has(self, url: str = None, infohash: str = None) -> bool:
+        with self.lock:
+            return (infohash or self.urls.get(url)) in self.entries
+
+    def put(self, infohash: str, data: bytes, url: str = None):
+        fd, tmp = tempfile.mkstemp(prefix=".tmp-", dir=self.directory)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, self._path(infohash))
+
+        evicted = []
+        with self.lock:
+            self.total += len(data) - self.entries.pop(infohash, 0)
+            self.entries[infohash] = len(data)
+            if url and "\n" not in url and "\t" not in url:
+                self.urls[url] = infohash
+                self.urls.move_to_end(url)
+                if len(self.urls) > URL_INDEX_LIMIT:
+                    self.urls.popitem(last=False)
+                with open(self.index_path, "a", encoding="utf-8") as f:
+                    f.write(f"{url}\t{infohash}\n")
+                self.index_lines += 1
+                if self.index_lines > 2 * URL_INDEX_LIMIT:
+                    self._rewrite_index()
+            while self.total > self.max_bytes and len(self.entries) > 1:
+                old, size = self.entries.popitem(last=False)
+                self.total -= size
+                evicted.append(old)
+        for old in evicted:
+            try:
+                os.remove(self._path(old))
+            except FileNotFoundError:
+                pass
+        if evicted:
+            logger.debug(f"Evicted {len(evicted)} cached torrents")
+
+
+#===================================================================
+#      Prefetcher
+#===================================================================
+
+class Prefetcher:
+    """
+    Starts downloading a payload's .torrent when it arrives, so the fetch
+    overlaps filtering, resolution and the Radarr check. The grab then
+    collects the bytes (waiting on the download if it is still running)
+    and uploads them to qBittorrent instead of passing the URL.
+    """
+
+    def __init__(self, settings: dict):
+        self.settings = dict(DEFAULTS, **settings)
+        self.cache = TorrentCache(self.settings["path"], self.settings["max_bytes"])
+        self.pending = {}              # url -> asyncio.Task
+        self.holders = {}              # url -> ids of payloads waiting on that download
+        self.client = None
+
+    @staticmethod
+    def url(payload: dict) -> str:
+        return payload.get("DownloadURL") or payload.get("TorrentUrl")
+
+    @staticmethod
+    def infohash(payload: dict) -> str:
+        return (payload.get("TorrentHash") or "").strip().lower() or None
+
+    @staticmethod
+    def attached(payload: dict) -> bool:
+        """
+        Does the payload carry a usable .torrent (see bencode.load_payload_torrent)?
+        """
+        if payload.get("TorrentDataRawBytes"):
+            return True
+        path = payload.get("TorrentTmpFile")
+        return bool(path) and os.path.isfile(path) and os.path.getsize(path) > 0
+
+    def start(self, payload: dict):
+        """
+        Begin fetching in the background. No-op when disabled, when the
+        torrent came with the payload, or when it is cached. Payloads
+        sharing a URL share one download.
+        """
+        url = self.url(payload)
+        if not self.settings["enabled"] or not url or self.attached(payload):
+            return
+        if url in self.pending:
+            self.holders[url].add(id(payload))
+            return
+        if self.cache.has(url=url, infohash=self.infohash(payload)):
+            return
+        task = asyncio.create_task(self._fetch(url))
+        self.pending[url] = task
+        self.holders[url] = {id(payload)}
+        task.add_done_callback(lambda _: self._release(url, task))
+
+    def _release(self, url: str, task: asyncio.Task):
+        if self.pending.get(url) is task:
+            del self.pending[url]
+            self.holders.pop(url, None)
+
+    def cancel(self, payload: dict):
+        """
+        Drop a payload that will not be grabbed. The download is cancelled
+        once no other payload is waiting on it.
+        """
+        url = self.url(payload)
+        holders = self.holders.get(url)
+        if holders is None:
+            return
+        holders.discard(id(payload))
+        if not holders:
+            self.holders.pop(url, None)
+            task = self.pending.pop(url, None)
+            if task:
+                task.cancel()
+
+    async def _fetch(self, url: str) -> bytes:
+        if self.client is None:
+            self.client = httpx.AsyncClient(timeout=self.settings["timeout"], follow_redirects=True)
+        start = time.monotonic()
+        try:
+            async with self.client.stream("GET", url) as response:
+                response.raise_for_status()
+                chunks, size = [], 0
+                async for chunk in response.aiter_bytes():
+                    size += len(chunk)
+                    if size > MAX_TORRENT_BYTES:
+                        raise ValueError(f"larger than {MAX_TORRENT_BYTES} bytes")
+                    chunks.append(chunk)
+            data = b"".join(chunks)
+            infohash = modules.bencode.torrent_info(data)["infohash"]
+            await asyncio.to_thread(self.cache.put, infohash, data, url)
+        except (httpx.HTTPError, ValueError, OSError) as e:
+            logger.warning(f"Prefetch failed for {url}: {e}")
+            return None
+        logger.debug(f"Prefetched {infohash} ({len(data)} bytes) in {(time.monotonic() - start) * 1000:.0f}ms")
+        return data
+
+    async def torrent_bytes(self, payload: dict) -> bytes:
+        """
+        The .torrent for a payload: attached to the announce, prefetched,
+        or still downloading. None means fall back to adding by URL.
+        """
+        buf = modules.bencode.load_payload_torrent(payload)
+        if buf is not None:
+            data = bytes(buf)
+            if hasattr(buf, "close"):
+                buf.close()
+            return data
+
+        url = self.url(payload)
+        task = self.pending.get(url) if url else None
+        if task is not None:
+            try:
+                return await asyncio.wait_for(asyncio.shield(task), self.settings["timeout"])
+            except asyncio.TimeoutError:
+                return None
+            except asyncio.CancelledError:
+                if not task.cancelled():
+                    raise          # the grab itself was cancelled
+                return None
+
+        infohash = self.infohash(payload)
+        if infohash:
+            data = await asyncio.to_thread(self.cache.get, infohash)
+            if data:
+                return data
+        if not url:
+            return None
+        return await asyncio.to_thread(self.cache.get_url, url)
+
+
+_prefetcher = None
+
+
+def prefetcher() -> Prefetcher:
+    """
+    The shared Prefetcher, created from config on first use.
+    """
+    global _prefetcher
+    if _prefetcher is None:
+        _prefetcher = Prefetcher(modules.config.PREFETCH)
+    return _prefetcher
+
+
+#===================================================================
+#      Benchmark
+#===================================================================
+
+def benchmark(grabs: int = 20, tracker_ms: int = 150, checks_ms: int = 100):
+    """
+    Announce-to-add latency with and without prefetch against a local stub
+    tracker (serves .torrent files after `tracker_ms`) and stub qBittorrent
+    (fetches URLs from the tracker itself, like the real client). The
+    filter/Radarr stages are modelled as `checks_ms` of awaiting.
+    Run with: python -m modules.prefetch
+    """
+    import shutil
+    import urllib.parse
+    import urllib.request
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    import modules.instances
+    import modules.qbittorrent
+
+    torrent = modules.bencode.encode({
+        "announce": "http://127.0.0.1/announce",
+        "info": {"name": "Bench.Movie.2025.1080p.WEB-DL-GRP", "piece length": 1 << 20,
+                 "pieces": os.urandom(20 * 400), "length": 400 << 20},
+    })
+
+    class Stub(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _reply(self, body: bytes):
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            time.sleep(tracker_ms / 1000)
+            self._reply(torrent)
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if self.path == "/api/v2/torrents/add" and "urlencoded" in self.headers.get("Content-Type", ""):
+                for url in urllib.parse.parse_qs(body.decode())["urls"]:
+                    urllib.request.urlopen(url).read()
+            self._reply(b"Ok.")
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Stub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host = f"http://127.0.0.1:{server.server_port}"
+    qbit = modules.instances.Instance("qbittorrent", {"name": "bench", "host": host})
+    workdir = tempfile.mkdtemp(prefix="squatflix-prefetch-")
+
+    async def grab(n: int, prefetch: Prefetcher) -> float:
+        payload = {"TorrentName": f"Bench.{n}", "DownloadURL": f"{host}/torrent/{n}"}
+        start = time.perf_counter()
+        if prefetch:
+            prefetch.start(payload)
+        await asyncio.sleep(checks_ms / 1000)
+        data = prefetch and await prefetch.torrent_bytes(payload)
+        if data:
+            await modules.qbittorrent.add_torrent_file(data, f"{n}.torrent", instance=qbit)
+        else:
+            await modules.qbittorrent.add_torrent(payload["DownloadURL"], instance=qbit)
+        return (time.perf_counter() - start) * 1000
+
+    async def run():
+        prefetch = Prefetcher({"path": workdir})
+        for name, engine in (("url", None), ("prefetch", prefetch)):
+            latencies = sorted([await grab(n, engine) for n in range(grabs)])
+            print(f"{name:<9}: p50 {latencies[len(latencies) // 2]:7.1f} ms   max {latencies[-1]:7.1f} ms")
+
+    try:
+        asyncio.run(run())
+    finally:
+        server.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    benchmark()
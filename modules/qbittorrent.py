@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+
+# =============================================================================
+# File: qbittorrent.py
+# Purpose: qBittorrent WebUI API calls for Squat-Flix Importer
+# Author: Joshua
+# Created: 2025-10-02
+# =============================================================================
+
+__version__ = "v0.1.0-beta"
+
+# ============================== Imports ======================================
+
+import modules.instances
+from modules.Jaylog import mklog
+
+# ============================== Logger =======================================
+
+logger = mklog(__name__, level="DEBUG", logfile="../logs/qbittorrent.log")
+
+#===================================================================
+#      Session
+#===================================================================
+# Each instance has its own pooled client; the SID cookie lives on it.
+
+async def _session(instance):
+    client = instance.session()
+    if not instance.logged_in:
+        await login(instance)
+    return client
+
+
+async def login(instance):
+    response = await instance.session().post("/api/v2/auth/login", data={
+        "username": instance.settings.get("username"),
+        "password": instance.settings.get("password"),
+    })
+    if response.status_code != 200 or response.text.strip() != "Ok.":
+        raise RuntimeError(f"qBittorrent '{instance.name}' login failed: {response.status_code} {response.text.strip()}")
+    instance.logged_in = True
+    logger.debug(f"Logged in to qBittorrent '{instance.name}'")
+
+
+#===================================================================
+#      Add Torrent
+#===================================================================
+
+async def _add(instance, data: dict, files: dict = None):
+    """
+    POST to torrents/add, re-authenticating once if the session has expired.
+    """
+    client = await _session(instance)
+    data = dict(data, category=data.get("category") or instance.settings.get("category", "radarr"))
+    response = await client.post("/api/v2/torrents/add", data=data, files=files)
+    if response.status_code == 403:
+        await login(instance)
+        response = await client.post("/api/v2/torrents/add", data=data, files=files)
+
+    if response.status_code != 200 or response.text.strip() != "Ok.":
+        raise RuntimeError(f"qBittorrent '{instance.name}' add failed: {response.status_code} {response.text.strip()}")
+
+
+async def add_torrent(url: str, category: str = None, instance=None) -> dict:
+    """
+    Ask qBittorrent to fetch and add a torrent by URL.
+    """
+    instance = instance or modules.instances.pick("qbittorrent")
+    await _add(instance, {"urls": url, "category": category})
+    logger.info(f"Added torrent to qBittorrent '{instance.name}': {url}")
+    return {"status": "added", "instance": instance.name}
+
+
+async def add_torrent_file(data: bytes, filename: str = "release.torrent", category: str = None, instance=None) -> dict:
+    """
+    Upload .torrent bytes we already hold, saving qBittorrent the fetch.
+    """
+    instance = instance or modules.instances.pick("qbittorrent")
+    await _add(
+        instance,
+        {"category": category},
+        files={"torrents": (filename, data, "application/x-bittorrent")},
+    )
+    logger.info(f"Uploaded torrent to qBittorrent '{instance.name}': {filename}")
+    return {"status": "added", "instance": instance.name}
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+
+# =============================================================================
+# File: radarr.py
+# Purpose: Radarr API calls for Squat-Flix Importer
+# Author: Joshua
+# Created: 2025-10-02
+# =============================================================================
+
+__version__ = "v0.1.0-beta"
+
+# ============================== Imports ======================================
+
+import httpx
+import modules.instances
+from modules.Jaylog import mklog
+
+# ============================== Logger =======================================
+
+logger = mklog(__name__, level="DEBUG", logfile="../logs/radarr.log")
+
+#===================================================================
+#      Request
+#===================================================================
+
+async def _get(instance, path: str, params: dict):
+    """
+    GET through the instance's pooled client. Raises RuntimeError on any
+    HTTP failure.
+    """
+    instance = instance or modules.instances.pick("radarr")
+    try:
+        response = await instance.session().get(
+            path, params=params, headers={"X-Api-Key": instance.settings.get("apikey")})
+        response.raise_for_status()
+        return response.json()
+    except httpx.HTTPError as e:
+        raise RuntimeError(f"Radarr '{instance.name}' {path} failed: {e}") from e
+
+
+#===================================================================
+#      Movie Lookup
+#===================================================================
+
+async def lookup_movie(title: str, year: int = None, instance=None) -> list:
+    """
+    Search Radarr's metadata proxy for a movie.
+    Returns the raw result list, or raises RuntimeError if the call failed
+    (so callers can tell an outage apart from "no such movie").
+    """
+    term = f"{title} {year}" if year else title
+    result = await _get(instance, "/api/v3/movie/lookup", {"term": term})
+    logger.debug(f"Radarr lookup '{term}' returned {len(result)} results")
+    return result
+
+
+#===================================================================
+#      Library Check
+#===================================================================
+
+async def has_movie(imdb_id: str, instance=None) -> bool:
+    """
+    True when the movie is already in this Radarr library with a file.
+    """
+    result = await _get(instance, "/api/v3/movie/lookup/imdb", {"imdbId": imdb_id})
+    return bool(result.get("id")) and bool(result.get("hasFile"))
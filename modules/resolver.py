@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+
+# =============================================================================
+# File: resolver.py
+# Purpose: Resolve (title, year) to IMDb/TMDB ids with a persistent cache
+# Author: Joshua
+# Created: 2025-10-02
+# =============================================================================
+
+__version__ = "v0.1.0-beta"
+
+# ============================== Imports ======================================
+
+import asyncio
+import difflib
+import re
+import time
+import unicodedata
+import modules.db
+import modules.radarr
+import modules.instances
+from modules.Jaylog import mklog
+
+# ============================== Logger =======================================
+
+logger = mklog(__name__, level="DEBUG", logfile="../logs/resolver.log")
+
+# ============================== Constants ====================================
+
+HIT_TTL = 30 * 24 * 3600     # a resolved movie rarely changes ids
+MISS_TTL = 6 * 3600          # retry misses a few times a day
+TITLE_SIMILARITY = 0.85      # fuzzy fallback: "spiderman" vs "spider man"
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+# In-flight lookups keyed on (title, year); concurrent callers share one.
+_inflight = {}
+
+#===================================================================
+#      Keys
+#===================================================================
+
+def normalize_title(title: str) -> str:
+    """
+    Fold case, accents and punctuation: "Amélie: The Movie" -> "amelie the movie".
+    """
+    text = unicodedata.normalize("NFKD", title or "").encode("ascii", "ignore").decode("ascii")
+    return _NON_ALNUM.sub(" ", text.lower()).strip()
+
+
+#===================================================================
+#      Lookup
+#===================================================================
+
+def _pick(results: list, title: str, year: int) -> dict:
+    """
+    Choose the best lookup result: exact title and year, then a close
+    title in the same year. Without a year, only an exact title matches.
+    """
+    titles = [normalize_title(movie.get("title")) for movie in results]
+    for movie, candidate in zip(results, titles):
+        if candidate == title and (not year or movie.get("year") == year):
+            return movie
+    if not year:
+        return None
+    for movie, candidate in zip(results, titles):
+        if movie.get("year") == year and \
+                difflib.SequenceMatcher(None, candidate, title).ratio() >= TITLE_SIMILARITY:
+            return movie
+    return None
+
+
+async def _fetch(title: str, year: int) -> dict:
+    try:
+        radarr = modules.instances.pick("radarr")
+        results = await radarr.call(modules.radarr.lookup_movie, title, year)
+    except RuntimeError as e:
+        # Outages and open breakers are not cached; the next announce will try again.
+        logger.warning(str(e))
+        return {"imdb_id": None, "tmdb_id": None}
+
+    movie = _pick(results, title, year) or {}
+    imdb_id = movie.get("imdbId") or None
+    tmdb_id = movie.get("tmdbId") or None
+    ttl = HIT_TTL if (imdb_id or tmdb_id) else MISS_TTL
+    await asyncio.to_thread(modules.db.cache_put, title, year, imdb_id, tmdb_id, time.time() + ttl)
+    return {"imdb_id": imdb_id, "tmdb_id": tmdb_id}
+
+
+async def resolve(title: str, year: int) -> dict:
+    """
+    Return {"imdb_id", "tmdb_id"} for a movie; both None on a miss.
+    Served from SQLite when fresh. Concurrent calls for the same key wait
+    on a single outbound lookup.
+    """
+    key = (normalize_title(title), year or 0)
+    if not key[0]:
+        return {"imdb_id": None, "tmdb_id": None}
+
+    cached = await asyncio.to_thread(modules.db.cache_get, key[0], key[1], time.time())
+    if cached is not None:
+        logger.debug(f"Resolution cache hit for {key}: {cached['imdb_id'] or 'miss'}")
+        return cached
+
+    pending = _inflight.get(key)
+    if pending is None:
+        pending = asyncio.ensure_future(_fetch(*key))
+        _inflight[key] = pending
+        pending.add_done_callback(lambda _: _inflight.pop(key, None))
+    else:
+        logger.debug(f"Joining in-flight lookup for {key}")
+
+    return await asyncio.shield(pending)
+
+
+async def fill_payload(payload: dict) -> dict:
+    """
+    Set MetaIMDB on a payload that arrived without one.
+    """
+    if payload.get("MetaIMDB") or not payload.get("Title"):
+        return payload
+
+    resolved = await resolve(payload["Title"], payload.get("Year"))
+    if resolved["imdb_id"]:
+        payload["MetaIMDB"] = resolved["imdb_id"]
+    return payload
@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+
+# =============================================================================
+# File: scheduler.py
+# Purpose: Priority grab queue with per-upstream rate limits and breakers
+# Author: Joshua
+# Created: 2025-10-02
+# =============================================================================
+
+__version__ = "v0.1.0-beta"
+
+# ============================== Imports ======================================
+
+import asyncio
+import itertools
+import re
+import time
+import modules.config
+from modules.Jaylog import mklog
+
+# ============================== Logger =======================================
+
+logger = mklog(__name__, level="DEBUG", logfile="../logs/scheduler.log")
+
+# ============================== Defaults =====================================
+# Overridden per upstream by the "scheduler" section of config.json.
+
+DEFAULT_LIMITS = {
+    "rate": 2.0,              # requests per second (token refill)
+    "burst": 5,               # bucket size
+    "concurrency": 4,         # in-flight requests
+    "error_rate": 0.5,        # open the breaker above this failure ratio...
+    "min_requests": 10,       # ...once this many calls are in the window
+    "window": 60.0,           # seconds of history the ratio is taken over
+    "cooldown": 30.0,         # seconds open before a half-open probe
+}
+
+WORKERS = 4
+
+# Failed grabs are requeued this many times, backing off from RETRY_BACKOFF
+# seconds (doubling, capped at RETRY_MAX) or until the breaker that
+# refused them would let a probe through, whichever is later.
+RETRIES = 4
+RETRY_BACKOFF = 5.0
+RETRY_MAX = 300.0
+
+_DURATION = re.compile(r"(\d+)\s*([hms])")
+_UNITS = {"h": 3600, "m": 60, "s": 1}
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling an upstream whose breaker is open."""
+
+    def __init__(self, message: str, retry_after: float = 0.0):
+        super().__init__(message)
+        self.retry_after = retry_after  # seconds until the breaker allows a probe
+
+
+#===================================================================
+#      Token Bucket
+#===================================================================
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+#===================================================================
+#      Circuit Breaker
+#===================================================================
+
+class CircuitBreaker:
+    """
+    closed    -> calls pass; outcomes recorded over a sliding window
+    open      -> calls fail fast until the cooldown passes
+    half_open -> one probe call; success closes, failure re-opens
+    """
+
+    def __init__(self, name: str, error_rate: float, min_requests: int, window: float, cooldown: float):
+        self.name = name
+        self.error_rate = error_rate
+        self.min_requests = min_requests
+        self.window = window
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.opened_at = 0.0
+        self.probing = False
+        self.outcomes = []  # (timestamp, ok)
+
+    def allow(self) -> bool:
+        if self.state == "open" and time.monotonic() - self.opened_at >= self.cooldown:
+            self.state = "half_open"
+            logger.info(f"Breaker '{self.name}' half-open, probing")
+        if self.state == "closed":
+            return True
+        if self.state == "half_open" and not self.probing:
+            self.probing = True
+            return True
+        return False
+
+    def available(self) -> bool:
+        """
+        Would allow() let a call through? Does not claim the half-open probe.
+        """
+        if self.state == "open":
+            return time.monotonic() - self.opened_at >= self.cooldown
+        return not (self.state == "half_open" and self.probing)
+
+    def retry_after(self) -> float:
+        """
+        Seconds until an open breaker would allow a probe; 0 otherwise.
+        """
+        if self.state != "open":
+            return 0.0
+        return max(0.0, self.cooldown - (time.monotonic() - self.opened_at))
+
+    def record(self, ok: bool):
+        now = time.monotonic()
+        if self.state == "half_open":
+            self.probing = False
+            if ok:
+                self.state = "closed"
+                self.outcomes = []
+                logger.info(f"Breaker '{self.name}' closed")
+            else:
+                self._open(now)
+            return
+
+        self.outcomes.append((now, ok))
+        self.outcomes = [o for o in self.outcomes if now - o[0] <= self.window]
+        failures = sum(1 for _, good in self.outcomes if not good)
+        if len(self.outcomes) >= self.min_requests and failures / len(self.outcomes) > self.error_rate:
+            self._open(now)
+
+    def release(self):
+        """
+        Give back a half-open probe that ended without an outcome
+        (cancelled), so the next call can probe instead.
+        """
+        if self.state == "half_open":
+            self.probing = False
+
+    def _open(self, now: float):
+        self.state = "open"
+        self.opened_at = now
+        self.outcomes = []
+        logger.warning(f"Breaker '{self.name}' open for {self.cooldown:.0f}s")
+
+
+#===================================================================
+#      Upstream
+#===================================================================
+
+class Upstream:
+    """
+    Guards every outbound call to one service: breaker, then rate limit,
+    then concurrency cap.
+    """
+
+    def __init__(self, name: str, limits: dict):
+        self.name = name
+        self.bucket = TokenBucket(limits["rate"], limits["burst"])
+        self.slots = asyncio.Semaphore(limits["concurrency"])
+        self.breaker = CircuitBreaker(name, limits["error_rate"], limits["min_requests"],
+                                      limits["window"], limits["cooldown"])
+
+    async def call(self, func, *args, **kwargs):
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"{self.name} circuit open", self.breaker.retry_after())
+        recorded = False
+        try:
+            await self.bucket.acquire()
+            async with self.slots:
+                try:
+                    result = await func(*args, **kwargs)
+                except Exception:
+                    recorded = True
+                    self.breaker.record(False)
+                    raise
+            recorded = True
+            self.breaker.record(True)
+            return result
+        finally:
+            if not recorded:
+                self.breaker.release()
+
+
+_upstreams = {}
+
+
+def upstream(name: str) -> Upstream:
+    """
+    Return the shared Upstream for a service, creating it from config on first use.
+    Per-instance names ("radarr:uhd") inherit the service's limits.
+    """
+    if name not in _upstreams:
+        limits = dict(DEFAULT_LIMITS)
+        limits.update(modules.config.SCHEDULER.get(name.split(":")[0], {}))
+        limits.update(modules.config.SCHEDULER.get(name, {}))
+        _upstreams[name] = Upstream(name, limits)
+    return _upstreams[name]
+
+
+#===================================================================
+#      Priority
+#===================================================================
+
+def pretime_seconds(pretime) -> float:
+    """
+    Autobrr sends PreTime as a duration string ("2m30s", "45s") or bare seconds.
+    """
+    if pretime in (None, ""):
+        return None
+    text = str(pretime).strip().lower()
+    if text.isdigit():
+        return float(text)
+    parts = _DURATION.findall(text)
+    if not parts:
+        return None
+    return float(sum(int(n) * _UNITS[u] for n, u in parts))
+
+
+def score(payload: dict) -> float:
+    """
+    Higher goes first. Freeleech dominates, then freshness, then seeders.
+    """
+    value = 0.0
+    if payload.get("Freeleech"):
+        value += 100 * (payload.get("FreeleechPercent") or 100) / 100
+
+    age = pretime_seconds(payload.get("PreTime"))
+    if age is not None:
+        value += max(0.0, 50 - age / 60)       # loses a point per minute, 0 after ~50m
+
+    seeders = payload.get("Seeders") or 0
+    value += min(seeders, 100) / 4             # caps at +25
+
+    return value
+
+
+def priority_class(value: float) -> str:
+    if value >= 100:
+        return "high"
+    if value >= 25:
+        return "normal"
+    return "low"
+
+
+#===================================================================
+#      Scheduler
+#===================================================================
+
+class GrabScheduler:
+    """
+    Priority queue between intake and the outbound clients. Jobs are
+    coroutine functions; the scheduler decides when they start, and the
+    Upstream guards inside them decide how fast they hit each service.
+    A job that raises is requeued with backoff up to RETRIES times.
+    """
+
+    def __init__(self, workers: int = WORKERS):
+        self.workers = workers
+        self.queue = None
+        self.tasks = []
+        self.seq = itertools.count()
+        self.waits = {c: {"count": 0, "total": 0.0, "max": 0.0} for c in ("high", "normal", "low")}
+        self.retrying = 0
+        self.retries = 0
+
+    def _start(self):
+        self.queue = asyncio.PriorityQueue()
+        self.tasks = [asyncio.create_task(self._worker(n)) for n in range(self.workers)]
+        logger.debug(f"Started {self.workers} grab workers")
+
+    def submit(self, payload: dict, job, *args) -> asyncio.Future:
+        """
+        Queue job(*args) at the payload's priority. Returns a future with the
+        job's result, or {"status": "error", ...} if it still raised after
+        its last retry.
+        """
+        if self.queue is None:
+            self._start()
+        value = score(payload)
+        future = asyncio.get_running_loop().create_future()
+        self._put(-value, priority_class(value), job, args, future, 0)
+        logger.debug(f"Queued {payload.get('TorrentName')} score={value:.1f} depth={self.queue.qsize()}")
+        return future
+
+    def _put(self, priority: float, klass: str, job, args: tuple, future: asyncio.Future, attempt: int):
+        self.queue.put_nowait((priority, next(self.seq), time.monotonic(), klass, job, args, future, attempt))
+
+    def _retry(self, priority: float, klass: str, job, args: tuple, future: asyncio.Future, attempt: int):
+        self.retrying -= 1
+        if not future.done():
+            self._put(priority, klass, job, args, future, attempt)
+
+    def _backoff(self, error: Exception, attempt: int) -> float:
+        delay = min(RETRY_MAX, RETRY_BACKOFF * 2 ** attempt)
+        return max(delay, getattr(error, "retry_after", 0.0))
+
+    async def _worker(self, n: int):
+        while True:
+            priority, _, queued, klass, job, args, future, attempt = await self.queue.get()
+            self._record_wait(klass, time.monotonic() - queued)
+            try:
+                result = await job(*args)
+                if not future.done():
+                    future.set_result(result)
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                if attempt < RETRIES and not future.done():
+                    delay = self._backoff(e, attempt)
+                    logger.warning(f"Grab job failed (attempt {attempt + 1}), retrying in {delay:.0f}s: {e}")
+                    self.retrying += 1
+                    self.retries += 1
+                    asyncio.get_running_loop().call_later(
+                        delay, self._retry, priority, klass, job, args, future, attempt + 1)
+                else:
+                    logger.warning(f"Grab job failed, giving up: {e}")
+                    if not future.done():
+                        future.set_result({"status": "error", "reason": str(e)})
+            finally:
+                self.queue.task_done()
+
+    def _record_wait(self, klass: str, wait: float):
+        stats = self.waits[klass]
+        stats["count"] += 1
+        stats["total"] += wait
+        stats["max"] = max(stats["max"], wait)
+
+    def metrics(self) -> dict:
+        return {
+            "depth": self.queue.qsize() if self.queue else 0,
+            "retrying": self.retrying,
+            "retries": self.retries,
+            "queue_wait": {
+                klass: {
+                    "count": s["count"],
+                    "avg": s["total"] / s["count"] if s["count"] else 0.0,
+                    "max": s["max"],
+                }
+                for klass, s in self.waits.items()
+            },
+            "breakers": {name: u.breaker.state for name, u in _upstreams.items()},
+        }
+
+
+scheduler = GrabScheduler()
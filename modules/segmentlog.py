@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+
+# =============================================================================
+# File: segmentlog.py
+# Purpose: Append-only segmented event log for high-ingest storage
+# Author: Joshua
+# Created: 2025-10-02
+# =============================================================================
+
+__version__ = "v0.1.0-beta"
+
+# ============================== Imports ======================================
+
+import bisect
+import mmap
+import os
+import struct
+import threading
+import zlib
+import modules.json
+from modules.Jaylog import mklog
+
+# ============================== Logger =======================================
+
+logger = mklog(__name__, level="DEBUG", logfile="../logs/segmentlog.log")
+
+# ============================== Layout =======================================
+#
+#   <base>.log   records: [u32 length][u32 crc32][length bytes of JSON]
+#   <base>.idx   entries: [u64 offset][u32 length], entry n is sequence base+n
+#
+# <base> is the zero-padded sequence number of the segment's first record,
+# so a sequence number maps to a segment by bisect and to its index entry
+# by arithmetic; sealed indexes are read through mmap.
+
+RECORD = struct.Struct("<II")
+ENTRY = struct.Struct("<QI")
+NAME_WIDTH = 20
+
+DEFAULT_SEGMENT_BYTES = 64 * 1024 * 1024
+
+
+class Segment:
+    def __init__(self, directory: str, base: int):
+        self.base = base
+        self.log_path = os.path.join(directory, f"{base:0{NAME_WIDTH}d}.log")
+        self.idx_path = os.path.join(directory, f"{base:0{NAME_WIDTH}d}.idx")
+        self.count = os.path.getsize(self.idx_path) // ENTRY.size if os.path.exists(self.idx_path) else 0
+        self._map = None
+
+    def entry(self, n: int) -> tuple:
+        if self._map is None:
+            with open(self.idx_path, "rb") as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return ENTRY.unpack_from(self._map, n * ENTRY.size)
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+
+class SegmentLog:
+    """
+    Sequential-write event store. append() returns the record's sequence
+    number; get(seq) reads it back without scanning. Segments roll over at
+    `segment_bytes`; only the newest one is ever written. With `fsync`,
+    each append is on disk before it returns; otherwise it is in the page
+    cache and a crash can lose the last few records.
+    """
+
+    def __init__(self, directory: str, segment_bytes: int = DEFAULT_SEGMENT_BYTES, fsync: bool = False):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.fsync = fsync
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+        bases = sorted(int(name[:-4]) for name in os.listdir(directory) if name.endswith(".log"))
+        self.segments = [Segment(directory, base) for base in bases]
+        if not self.segments:
+            self.segments.append(Segment(directory, 0))
+        self._open_active()
+
+    # ------------------------------------------------------------ write side
+
+    def _open_active(self):
+        active = self.segments[-1]
+        self.active_offsets = self._recover(active)
+        self.log = open(active.log_path, "ab")
+        self.idx = open(active.idx_path, "ab")
+        self.position = self.log.tell()
+
+    def _recover(self, segment: Segment) -> list:
+        """
+        Rebuild the active segment's index from its log, dropping a torn tail.
+        Returns the (offset, length) entries.
+        """
+        if not os.path.exists(segment.log_path):
+            open(segment.log_path, "wb").close()
+        entries = []
+        offset = 0
+        with open(segment.log_path, "rb") as f:
+            data = f.read()
+        while offset + RECORD.size <= len(data):
+            length, crc = RECORD.unpack_from(data, offset)
+            body = data[offset + RECORD.size:offset + RECORD.size + length]
+            if len(body) != length or zlib.crc32(body) != crc:
+                break
+            entries.append((offset, length))
+            offset += RECORD.size + length
+        if offset != len(data):
+            logger.warning(f"Truncating torn tail of {segment.log_path} at {offset} bytes")
+            with open(segment.log_path, "r+b") as f:
+                f.truncate(offset)
+        with open(segment.idx_path, "wb") as f:
+            f.write(b"".join(ENTRY.pack(*entry) for entry in entries))
+        segment.count = len(entries)
+        return entries
+
+    def _roll(self):
+        self.log.close()
+        self.idx.close()
+        base = self.segments[-1].base + self.segments[-1].count
+        self.segments.append(Segment(self.directory, base))
+        self.log = open(self.segments[-1].log_path, "ab")
+        self.idx = open(self.segments[-1].idx_path, "ab")
+        self.active_offsets = []
+        self.position = 0
+        logger.debug(f"Rolled to segment {base}")
+
+    def seal(self) -> bool:
+        """
+        Roll over early so the records written so far become a sealed
+        segment. No-op (returns False) when the active segment is empty.
+        """
+        with self.lock:
+            if not self.segments[-1].count:
+                return False
+            self._roll()
+            return True
+
+    def append(self, record: dict) -> int:
+        body = modules.json.encode(record)
+        with self.lock:
+            if self.position and self.position + RECORD.size + len(body) > self.segment_bytes:
+                self._roll()
+            active = self.segments[-1]
+            self.log.write(RECORD.pack(len(body), zlib.crc32(body)) + body)
+            self.log.flush()
+            if self.fsync:
+                os.fsync(self.log.fileno())
+            self.idx.write(ENTRY.pack(self.position, len(body)))
+            self.idx.flush()
+            self.active_offsets.append((self.position, len(body)))
+            self.position += RECORD.size + len(body)
+            seq = active.base + active.count
+            active.count += 1
+        return seq
+
+    # ------------------------------------------------------------- read side
+
+    def _locate(self, seq: int) -> Segment:
+        i = bisect.bisect_right([s.base for s in self.segments], seq) - 1
+        if i < 0 or seq - self.segments[i].base >= self.segments[i].count:
+            return None
+        return self.segments[i]
+
+    def get(self, seq: int) -> dict:
+        """
+        Read one record by sequence number, or None if it is not in the log
+        (never written, or already compacted away).
+        """
+        with self.lock:
+            segment = self._locate(seq)
+            if segment is None:
+                return None
+            n = seq - segment.base
+            if segment is self.segments[-1]:
+                offset, length = self.active_offsets[n]
+            else:
+                offset, length = segment.entry(n)
+            # Opened under the lock so a concurrent drop() can only unlink
+            # the file, not pull it out from under us.
+            f = open(segment.log_path, "rb")
+        with f:
+            f.seek(offset + RECORD.size)
+            return modules.json.decode(f.read(length))
+
+    def next_seq(self) -> int:
+        with self.lock:
+            return self.segments[-1].base + self.segments[-1].count
+
+    def first_seq(self) -> int:
+        with self.lock:
+            return self.segments[0].base
+
+    def sealed(self) -> list:
+        with self.lock:
+            return list(self.segments[:-1])
+
+    def scan(self):
+        """
+        Yield (seq, record) for every record in the log, oldest first.
+        Meant for startup, before appends and compaction begin.
+        """
+        for segment in self.sealed():
+            yield from self.read_segment(segment)
+        with self.lock:
+            active = self.segments[-1]
+            entries = list(self.active_offsets)
+            f = open(active.log_path, "rb")
+        with f:
+            data = memoryview(f.read())
+        for n, (offset, length) in enumerate(entries):
+            yield active.base + n, modules.json.decode(data[offset + RECORD.size:offset + RECORD.size + length])
+
+    def read_segment(self, segment: Segment):
+        """
+        Yield (seq, record) for every record of a sealed segment, in order.
+        """
+        with open(segment.log_path, "rb") as f:
+            data = memoryview(f.read())
+        for n in range(segment.count):
+            offset, length = segment.entry(n)
+            yield segment.base + n, modules.json.decode(data[offset + RECORD.size:offset + RECORD.size + length])
+
+    def drop(self, segment: Segment):
+        """
+        Delete a sealed segment once its records live somewhere else.
+        """
+        with self.lock:
+            self.segments.remove(segment)
+        segment.close()
+        os.remove(segment.log_path)
+        os.remove(segment.idx_path)
+
+    def close(self):
+        with self.lock:
+            self.log.close()
+            self.idx.close()
+            for segment in self.segments:
+                segment.close()
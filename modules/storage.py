@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+
+# =============================================================================
+# File: storage.py
+# Purpose: Pluggable event storage (SQLite or segmented log + compactor)
+# Author: Joshua
+# Created: 2025-10-02
+# =============================================================================
+
+__version__ = "v0.1.0-beta"
+
+# ============================== Imports ======================================
+
+import abc
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+import modules.config
+import modules.db
+import modules.feed
+import modules.segmentlog
+from modules.Jaylog import mklog
+
+# ============================== Logger =======================================
+
+logger = mklog(__name__, level="DEBUG", logfile="../logs/storage.log")
+
+# ============================== Defaults =====================================
+
+DEFAULT_ENGINE = "sqlite"
+DEFAULT_LOG_DIR = "./logs/segments"
+COMPACT_INTERVAL = 30.0
+
+#===================================================================
+#      Backends
+#===================================================================
+
+class StorageBackend(abc.ABC):
+    """
+    What intake and the dashboard need from event storage.
+    """
+
+    @abc.abstractmethod
+    def store(self, source: str, payload: dict) -> int:
+        """
+        Store one event. Returns its sequence number (row id), or None if
+        the backend dropped it as a duplicate.
+        """
+
+    def store_many(self, source: str, payloads: list) -> list:
+        """
+        Store several events. Returns one sequence number per payload,
+        None where it was dropped as a duplicate.
+        """
+        return [self.store(source, payload) for payload in payloads]
+
+    @abc.abstractmethod
+    def fetch(self, limit: int = 250) -> list:
+        """
+        The most recent payloads, newest first.
+        """
+
+    def seen(self, dedup_key: str) -> bool:
+        """
+        Has an event with this dedup key been stored?
+        """
+        return modules.db.event_seen(dedup_key)
+
+    def close(self):
+        pass
+
+
+class SQLiteBackend(StorageBackend):
+    """
+    One INSERT per event straight into the events table; batches share
+    one transaction.
+    """
+
+    def store(self, source: str, payload: dict) -> int:
+        row_id = modules.db.store_json(source, payload)
+        modules.feed.feed.notify()
+        return row_id
+
+    def store_many(self, source: str, payloads: list) -> list:
+        row_ids = modules.db.store_batch([modules.db.event_row(source, payload) for payload in payloads])
+        modules.feed.feed.notify()
+        return row_ids
+
+    def fetch(self, limit: int = 250) -> list:
+        return modules.db.fetch_json(limit)
+
+
+class SegmentLogBackend(StorageBackend):
+    """
+    Appends to a segmented log; every compact_interval a background
+    compactor seals the active segment, folds sealed segments into SQLite
+    (deduplicated via dedup_key) and deletes them. Reads serve the log
+    first, then SQLite. The dashboard and live event feed follow SQLite,
+    so they see these events within one compact_interval.
+
+    Dedup keys and event ids of records still in the log are kept in
+    memory (rebuilt from the segments on open), so duplicates are caught
+    before compaction and an event id maps to its sequence number.
+    """
+
+    def __init__(self, directory: str, segment_bytes: int, compact_interval: float = COMPACT_INTERVAL,
+                 fsync: bool = False):
+        self.log = modules.segmentlog.SegmentLog(directory, segment_bytes, fsync)
+        self.keys = set()
+        self.events = {}   # event_id -> seq, for records still in the log
+        for seq, record in self.log.scan():
+            self._index(seq, record["payload"])
+        self.compact_interval = compact_interval
+        self.stopping = threading.Event()
+        self.compactor = None
+        if compact_interval:
+            self.compactor = threading.Thread(target=self._compact_loop, name="segment-compactor", daemon=True)
+            self.compactor.start()
+
+    def _index(self, seq: int, payload: dict):
+        key = modules.db.event_key(payload)
+        if key:
+            self.keys.add(key)
+        if payload.get("event_id"):
+            self.events[payload["event_id"]] = seq
+
+    def store(self, source: str, payload: dict) -> int:
+        if self.seen(modules.db.event_key(payload)):
+            return None
+        seq = self.log.append({
+            "source": source,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "payload": payload,
+        })
+        self._index(seq, payload)
+        return seq
+
+    def seen(self, dedup_key: str) -> bool:
+        if dedup_key and dedup_key in self.keys:
+            return True
+        return modules.db.event_seen(dedup_key)
+
+    def get(self, seq: int) -> dict:
+        record = self.log.get(seq)
+        return record and record["payload"]
+
+    def locate(self, event_id: str) -> int:
+        """
+        Sequence number of an event still in the log, or None.
+        """
+        return self.events.get(event_id)
+
+    def fetch(self, limit: int = 250) -> list:
+        results = []
+        seq = self.log.next_seq() - 1
+        first = self.log.first_seq()
+        while seq >= first and len(results) < limit:
+            record = self.log.get(seq)
+            if record is not None:
+                results.append(record["payload"])
+            seq -= 1
+        if len(results) < limit:
+            results.extend(modules.db.fetch_json(limit - len(results)))
+        return results
+
+    def compact(self) -> int:
+        """
+        Seal the active segment, then fold every sealed segment into
+        SQLite. Returns rows inserted. Run every compact_interval, so
+        SQLite (and the dashboard reading it) lags the log by at most that.
+        """
+        self.log.seal()
+        inserted = 0
+        for segment in self.log.sealed():
+            records = [r for _, r in self.log.read_segment(segment)]
+            rows = [modules.db.event_row(r["source"], r["payload"], r["timestamp"]) for r in records]
+            inserted += modules.db.store_many(rows)
+            modules.feed.feed.notify()
+            # SQLite answers for these from here on
+            self.keys.difference_update(row[4] for row in rows if row[4])
+            end = segment.base + segment.count
+            for r in records:
+                event_id = r["payload"].get("event_id")
+                if event_id and self.events.get(event_id, end) < end:
+                    self.events.pop(event_id, None)
+            self.log.drop(segment)
+            logger.debug(f"Compacted segment {segment.base} ({len(rows)} records)")
+        return inserted
+
+    def _compact_loop(self):
+        while not self.stopping.wait(self.compact_interval):
+            try:
+                self.compact()
+            except Exception as e:
+                logger.warning(f"Compaction failed: {e}")
+
+    def close(self):
+        self.stopping.set()
+        if self.compactor:
+            self.compactor.join()
+        self.log.close()
+
+
+_backend = None
+
+
+def backend() -> StorageBackend:
+    """
+    The configured storage engine ("storage.engine" in config.json).
+    """
+    global _backend
+    if _backend is None:
+        settings = modules.config.STORAGE
+        engine = settings.get("engine", DEFAULT_ENGINE)
+        if engine == "segmentlog":
+            _backend = SegmentLogBackend(
+                settings.get("path", DEFAULT_LOG_DIR),
+                settings.get("segment_bytes", modules.segmentlog.DEFAULT_SEGMENT_BYTES),
+                settings.get("compact_interval", COMPACT_INTERVAL),
+                settings.get("fsync", False),
+            )
+        elif engine == "sqlite":
+            _backend = SQLiteBackend()
+        else:
+            raise ValueError(f"Unknown storage engine: {engine}")
+        logger.info(f"Using '{engine}' storage backend")
+    return _backend
+
+
+#===================================================================
+#      Benchmark
+#===================================================================
+
+def benchmark(count: int = 20000):
+    """
+    Ingest the same payloads through both engines. SQLite commits (and
+    fsyncs) every event, so the log is measured both with an fsync per
+    append (same durability) and without (page cache only).
+    Run with: python -m modules.storage
+    """
+    payload = {
+        "TorrentName": "Prime.Minister.2025.1080p.WEB-DL.DDP5.1.H.264-FLUX",
+        "Indexer": "reelflix", "Size": 4788888535, "Seeders": 12, "Freeleech": True,
+        "FilterName": "RFx - Movies - 2025 - 1080p x264", "Description": "x" * 1500,
+    }
+    workdir = tempfile.mkdtemp(prefix="squatflix-bench-")
+    modules.db.DB_PATH = os.path.join(workdir, "bench.db")
+    modules.db.init()
+
+    try:
+        engines = [
+            ("sqlite", "commit + fsync per event", SQLiteBackend()),
+            ("segmentlog", "fsync per event", SegmentLogBackend(
+                os.path.join(workdir, "synced"), 8 * 1024 * 1024, 0, fsync=True)),
+            ("segmentlog", "no fsync, page cache only", SegmentLogBackend(
+                os.path.join(workdir, "unsynced"), 8 * 1024 * 1024, 0)),
+        ]
+        for name, durability, engine in engines:
+            start = time.perf_counter()
+            for n in range(count):
+                engine.store("bench", dict(payload, TorrentID=f"{durability}-{n}"))
+            elapsed = time.perf_counter() - start
+            print(f"{name:<11}: {count / elapsed:>10,.0f} events/sec   ({durability})")
+            if isinstance(engine, SegmentLogBackend):
+                start = time.perf_counter()
+                folded = engine.compact()
+                print(f"{'compaction':<11}: {folded / (time.perf_counter() - start):>10,.0f} events/sec")
+            engine.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+
+# =============================================================================
+# File: timeline.py
+# Purpose: Per-event lifecycle timeline for announce-to-grab latency
+# Author: Joshua
+# Created: 2025-10-02
+# =============================================================================
+
+__version__ = "v0.1.0-beta"
+
+# ============================== Imports ======================================
+
+import asyncio
+import threading
+import time
+import uuid
+import modules.db
+from modules.Jaylog import mklog
+
+# ============================== Logger =======================================
+
+logger = mklog(__name__, level="DEBUG", logfile="../logs/timeline.log")
+
+# ============================== Buffer =======================================
+# Finished timelines are written in batches, not per stage.
+
+FLUSH_ROWS = 500
+FLUSH_SECONDS = 5.0
+
+_buffer = []
+_buffer_lock = threading.Lock()
+_last_flush = time.monotonic()
+
+#===================================================================
+#      Timeline
+#===================================================================
+
+class Timeline:
+    """
+    Stage marks for one event. Offsets come from the monotonic clock and
+    are relative to when the webhook was received; each mark closes the
+    stage that ran since the previous one.
+    """
+
+    def __init__(self, event_id: str = None):
+        self.event_id = event_id or uuid.uuid4().hex[:16]
+        self.started_at = time.time()
+        self.origin = time.monotonic()
+        self.marks = [("received", 0.0)]
+        self.finished = False
+
+    def mark(self, stage: str):
+        self.marks.append((stage, (time.monotonic() - self.origin) * 1000))
+
+    def finish(self, outcome: str):
+        """
+        Record the final mark and queue the timeline for the next batch write.
+        """
+        if self.finished:
+            return
+        self.mark(outcome)
+        self.finished = True
+        rows = [(self.event_id, seq, stage, offset, self.started_at)
+                for seq, (stage, offset) in enumerate(self.marks)]
+        logger.debug(f"Event {self.event_id} {outcome} after {self.marks[-1][1]:.1f}ms")
+        with _buffer_lock:
+            _buffer.extend(rows)
+            due = len(_buffer) >= FLUSH_ROWS or time.monotonic() - _last_flush >= FLUSH_SECONDS
+        if due:
+            _flush_soon()
+
+
+def _flush_soon():
+    """
+    Flush on a worker thread when called from the event loop, so the
+    SQLite write never blocks request handling.
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        flush()
+        return
+    loop.run_in_executor(None, flush).add_done_callback(_flush_failed)
+
+
+def _flush_failed(future):
+    if not future.cancelled() and future.exception():
+        logger.warning(f"Timeline flush failed: {future.exception()}")
+
+
+def flush():
+    """
+    Write every buffered row now. Blocking; also called on shutdown.
+    """
+    global _buffer, _last_flush
+    with _buffer_lock:
+        rows, _buffer = _buffer, []
+        _last_flush = time.monotonic()
+    if rows:
+        modules.db.store_timeline(rows)
+
+
+#===================================================================
+#      Report
+#===================================================================
+
+def _percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def report(events: int = 1000, slowest: int = 20) -> dict:
+    """
+    Per-stage latency over the most recent events, plus the slowest events
+    with their stage breakdown. Stage duration = offset minus previous offset.
+    """
+    flush()
+
+    per_stage = {}
+    totals = []
+    current = None
+    breakdown = {}
+    previous = 0.0
+
+    for event_id, seq, stage, offset, started_at in modules.db.fetch_timeline(events):
+        if event_id != current:
+            if current is not None:
+                totals.append((previous, current, breakdown))
+            current, breakdown, previous = event_id, {}, 0.0
+        if seq:
+            duration = offset - previous
+            per_stage.setdefault(stage, []).append(duration)
+            breakdown[stage] = round(duration, 2)
+        previous = offset
+    if current is not None:
+        totals.append((previous, current, breakdown))
+
+    totals.sort(reverse=True)
+    return {
+        "events": len(totals),
+        "stages": {
+            stage: {
+                "count": len(values),
+                "avg_ms": round(sum(values) / len(values), 2),
+                "p50_ms": round(_percentile(values, 50), 2),
+                "p95_ms": round(_percentile(values, 95), 2),
+                "max_ms": round(max(values), 2),
+            }
+            for stage, values in per_stage.items()
+        },
+        "slowest": [
+            {"event_id": event_id, "total_ms": round(total, 2), "stages": stages}
+            for total, event_id, stages in totals[:slowest]
+        ],
+    }
@@ -37,8 +37,11 @@ VERSION = "0.5.0-beta"
 #   IMPORTS
 # ===========================================================================================
 
-import sys, argparse, json, os, time
-from web.logger import setup_logger
+import sys, argparse, os, time
+import modules.importer
+import modules.json
+import modules.models
+from modules.Jaylog import mklog
 
 
 sys.dont_write_bytecode = True
@@ -106,6 +109,27 @@ def parse_args():
         help="Path can be relative or absolute. Example /home/me/logs or ./../../logs"
     )
 
+    parser.add_argument(
+        "--import-dir",
+        type=str,
+        default=None,
+        help="Bulk import archived autobrr_event_*.json files from this directory and exit"
+    )
+
+    parser.add_argument(
+        "--checkpoint",
+        type=str,
+        default=None,
+        help="Checkpoint file for --import-dir (default: <dir>/.import_checkpoint.json)"
+    )
+
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes for --import-dir (default: CPU count)"
+    )
+
     return parser.parse_args()
 
 # -------------------------------------------------------- CLI ARGUMENT PARSER
@@ -132,12 +156,11 @@ def load_config(path="config.json", logger=None):
         raise FileNotFoundError(f"Config file not found: {path}")
 
     try:
-        with open(path, "r") as f:
-            config = json.load(f)
+        config = modules.json.load(path)
         if logger:
             logger.info(f"Loaded config from {path}")
         return config
-    except json.JSONDecodeError as e:
+    except modules.json.DecodeError as e:
         if logger:
             logger.error(f"Invalid JSON in config file: {e}")
         raise
@@ -156,22 +179,44 @@ def load_config(path="config.json", logger=None):
 def validate_config(config, logger=None):
     required = {
         "autobrr": ["host", "apikey"],
+        "filters": ["min_seeders", "quality"]
+    }
+    # Checked on every entry of the section's "instances" list (or the single-host section)
+    instance_required = {
         "radarr": ["host", "apikey"],
         "qbittorrent": ["host", "username", "password"],
-        "filters": ["min_seeders", "quality"]
     }
 
-    for section, keys in required.items():
+    def fail(msg):
+        if logger: logger.error(msg)
+        raise ValueError(msg)
+
+    for section in list(required) + list(instance_required):
         if section not in config:
-            msg = f"Missing section: {section}"
-            if logger: logger.error(msg)
-            raise ValueError(msg)
+            fail(f"Missing section: {section}")
 
+    for section, keys in required.items():
         for key in keys:
             if key not in config[section]:
-                msg = f"Missing key in '{section}': {key}"
-                if logger: logger.error(msg)
-                raise ValueError(msg)
+                fail(f"Missing key in '{section}': {key}")
+
+    for section, keys in instance_required.items():
+        entries = modules.models.instance_entries(config[section])
+        if not entries:
+            fail(f"No instances in '{section}': set 'host' or an 'instances' list")
+        names = set()
+        for entry in entries:
+            name = entry.get("name", "default")
+            if name in names:
+                fail(f"Duplicate instance name in '{section}': {name}")
+            names.add(name)
+            for key in keys:
+                if key not in entry:
+                    fail(f"Missing key in '{section}' instance '{name}': {key}")
+            try:
+                modules.models.InstanceSettings(**entry)
+            except ValueError as e:
+                fail(f"Invalid '{section}' instance '{name}': {e}")
 
     if logger:
         logger.info("Config structure validated successfully")
@@ -191,9 +236,9 @@ def validate_config(config, logger=None):
 def run_task(label, func, *args, logger=None, **kwargs):
     if logger:
         logger.debug(f"Starting: {label}")
-    start = time.time()
+    start = time.monotonic()
     result = func(*args, **kwargs)
-    elapsed = time.time() - start
+    elapsed = time.monotonic() - start
     if logger:
         logger.debug(f"Finished: {label} (elapsed: {elapsed:.3f}s)")
     return result
@@ -250,16 +295,25 @@ def process_radarr(config, logger):
         if logger: logger.error("Missing 'radarr' section in config")
         raise ValueError("Missing 'radarr' section in config")
 
-    host = radarr.get("host")
-    apikey = radarr.get("apikey")
+    entries = modules.models.instance_entries(radarr)
+    if not entries:
+        if logger: logger.error("No Radarr instances configured")
+        raise ValueError("No Radarr instances configured")
 
-    if not host or not apikey:
-        if logger: logger.error("Missing required Radarr keys: host or apikey")
-        raise ValueError("Missing required Radarr keys: host or apikey")
+    for entry in entries:
+        name = entry.get("name", "default")
+        host = entry.get("host")
+        apikey = entry.get("apikey")
+
+        if not host or not apikey:
+            if logger: logger.error(f"Missing required Radarr keys for instance '{name}': host or apikey")
+            raise ValueError(f"Missing required Radarr keys for instance '{name}': host or apikey")
+
+        if logger:
+            logger.info(f"Radarr instance '{name}' host: {host}")
+            logger.debug(f"Radarr instance '{name}' API key: {apikey}")
 
     if logger:
-        logger.info(f"Radarr host: {host}")
-        logger.debug(f"Radarr API key: {apikey}")
         logger.warning("Radarr intake stub completed (no real action taken)")
 
 # ------------------------------------------------------------------------------------------- Radarr Intake
@@ -275,9 +329,17 @@ def process_radarr(config, logger):
 
 def main():
     args = parse_args()
-    logger = setup_logger(level="DEBUG",log_path=LOG_PATH)
+    logger = mklog("squatflix", level=args.loglevel, logfile=args.logpath or LOG_PATH)
 
     logger.info(f"Squat-Flix-Importer started (v{VERSION})")
+
+    if args.import_dir:
+        summary = run_task("Bulk import", modules.importer.import_dir, args.import_dir,
+                           checkpoint=args.checkpoint, workers=args.workers, logger=logger)
+        logger.info(f"Imported {summary['inserted']} events from {summary['files']} files "
+                    f"({summary['files_per_sec']} files/sec, {summary['errors']} errors)")
+        return
+
     logger.info(f"Mode selected: {'Interactive' if args.interactive else 'Autonomous'}")
 
     try:
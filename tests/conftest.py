@@ -0,0 +1,21 @@
+import os
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# modules.config reads this at import time
+os.environ.setdefault("CONFIG_PATH", os.path.join(ROOT, "json", "config.json"))
+_TMP = tempfile.mkdtemp(prefix="squatflix-test-")
+os.environ.setdefault("SQLITE_DB_PATH", os.path.join(_TMP, "test.db"))
+os.environ.setdefault("SQUATFLIX_LOG", os.path.join(_TMP, "squatflix.log"))
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """A fresh events database for one test."""
+    import modules.db
+    monkeypatch.setattr(modules.db, "DB_PATH", str(tmp_path / "events.db"))
+    modules.db.init()
+    return modules.db
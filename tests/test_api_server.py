@@ -0,0 +1,184 @@
+import asyncio
+import json
+import os
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import modules.autobrr
+import modules.feed
+import modules.resolver
+import modules.scheduler
+import modules.storage
+import modules.timeline
+import web.api_server as api_server
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def release(n, **extra):
+    return dict({"TorrentName": f"Movie.{n}.2020.1080p.WEB-DL-GRP", "Indexer": "idx",
+                 "MetaIMDB": f"tt{n:07d}", "Seeders": 50}, **extra)
+
+
+@pytest.fixture
+def client(db, monkeypatch):
+    grabs = []
+    monkeypatch.setattr(modules.storage, "_backend", modules.storage.SQLiteBackend())
+    monkeypatch.setattr(modules.timeline, "_buffer", [])
+    monkeypatch.setattr(modules.feed, "feed", modules.feed.EventFeed())
+    monkeypatch.setattr(modules.feed, "POLL_SECONDS", 0.05)
+    monkeypatch.setattr(modules.autobrr, "loadFilters", lambda: {})
+
+    async def resolve(title, year):
+        return {"imdb_id": None, "tmdb_id": None}
+
+    monkeypatch.setattr(modules.resolver, "resolve", resolve)
+
+    def submit(payload, job, *args):
+        grabs.append(payload)
+        return asyncio.get_running_loop().create_future()
+
+    monkeypatch.setattr(modules.scheduler.scheduler, "submit", submit)
+    with TestClient(api_server.app) as test_client:
+        test_client.grabs = grabs
+        yield test_client
+
+
+def statuses(body):
+    return [r["status"] for r in body["results"]]
+
+
+def test_batch_json_array(client):
+    records = [release(1), release(2), release(1), {"TorrentName": ["not", "a", "string"]}]
+    response = client.post("/webhook/autobrr/batch", content=json.dumps(records))
+    assert response.status_code == 200
+    body = response.json()
+    assert statuses(body) == ["accepted", "accepted", "duplicate", "error"]
+    assert [r["index"] for r in body["results"]] == [0, 1, 2, 3]
+    assert body["accepted"] == 2
+    assert [p["TorrentName"] for p in client.grabs] == ["Movie.1.2020.1080p.WEB-DL-GRP",
+                                                        "Movie.2.2020.1080p.WEB-DL-GRP"]
+
+
+def test_batch_ndjson(client):
+    lines = [json.dumps(release(1)), "{not json", json.dumps(release(2))]
+    response = client.post("/webhook/autobrr/batch", content="\n".join(lines) + "\n",
+                           headers={"Content-Type": "application/x-ndjson"})
+    body = response.json()
+    assert statuses(body) == ["accepted", "error", "accepted"]
+    assert len(client.grabs) == 2
+
+
+def test_batch_grabs_only_stored_rows(client, monkeypatch):
+    # Another request stored the release between our dedup check and our insert
+    backend = modules.storage.backend()
+    backend.store("autobrr", release(1))
+    monkeypatch.setattr(backend, "seen", lambda key: False)
+
+    body = client.post("/webhook/autobrr/batch", content=json.dumps([release(1), release(2)])).json()
+    assert statuses(body) == ["duplicate", "accepted"]
+    assert [p["MetaIMDB"] for p in client.grabs] == ["tt0000002"]
+
+
+def test_single_webhook_duplicate_not_grabbed(client, monkeypatch):
+    backend = modules.storage.backend()
+    backend.store("autobrr", release(1))
+    monkeypatch.setattr(backend, "seen", lambda key: False)
+
+    assert client.post("/webhook/autobrr", json=release(1)).json()["status"] == "duplicate"
+    assert client.post("/webhook/autobrr", json=release(2)).json()["status"] == "accepted"
+    assert len(client.grabs) == 1
+
+
+def test_webhook_coerces_autobrr_macros(client):
+    with open(os.path.join(ROOT, "json", "autobrr_trigger.json")) as f:
+        trigger = json.load(f)
+    response = client.post("/webhook/autobrr", json=trigger)
+    assert response.status_code == 200
+    assert response.json()["title"] == "Prime Minister"
+
+    body = client.post("/webhook/autobrr/batch", content=json.dumps([trigger])).json()
+    assert statuses(body) != ["error"]
+
+
+def test_timeline_metrics(client):
+    client.post("/webhook/autobrr/batch", content=json.dumps([release(1), release(1)]))
+    report = client.get("/metrics/timeline").json()
+    # the accepted event's timeline stays open until its (stubbed) grab runs
+    assert report["events"] == 1
+    assert set(report["stages"]) == {"parse", "resolve", "filter", "dedup", "duplicate"}
+
+
+def test_scheduler_metrics(client):
+    assert "instances" in client.get("/metrics/scheduler").json()
+
+
+def test_debug_endpoints_need_token(client, monkeypatch):
+    assert client.get("/debug/tasks").status_code == 404
+    monkeypatch.setattr(api_server, "DEBUG_TOKEN", "secret")
+    assert client.get("/debug/tasks", headers={"X-Debug-Token": "wrong"}).status_code == 403
+
+    headers = {"X-Debug-Token": "secret"}
+    assert client.get("/debug/tasks", headers=headers).status_code == 200
+    profile = client.get("/debug/profile", params={"seconds": 0.05}, headers=headers)
+    assert profile.status_code == 200
+    first = client.post("/debug/memory/snapshot", headers=headers).json()
+    second = client.post("/debug/memory/snapshot", headers=headers).json()
+    diff = client.get("/debug/memory/diff", params={"first": first["id"], "second": second["id"]}, headers=headers)
+    assert diff.status_code == 200
+    assert client.delete("/debug/memory", headers=headers).json() == {"status": "stopped"}
+
+
+def test_events_stream_resumes_from_last_event_id(client):
+    for n in range(3):
+        modules.storage.backend().store("autobrr", release(n))
+
+    # TestClient buffers whole bodies, so read the endless SSE stream directly
+    async def run():
+        response = await api_server.events_stream(since_id=0, last_event_id="1")
+        chunks = []
+        async for chunk in response.body_iterator:
+            if chunk.startswith(b"id: "):
+                chunks.append(chunk)
+            if len(chunks) == 2:
+                break
+        await response.body_iterator.aclose()
+        return response.media_type, chunks
+
+    media_type, chunks = asyncio.run(asyncio.wait_for(run(), 2))
+    assert media_type == "text/event-stream"
+    assert [int(c.split(b"\n")[0][4:]) for c in chunks] == [2, 3]
+    assert json.loads(chunks[0].split(b"data: ")[1])["title"] == "Movie.1.2020.1080p.WEB-DL-GRP"
+
+
+def test_events_page_cached_until_new_event(client):
+    modules.storage.backend().store("autobrr", release(1))
+    first = client.get("/events")
+    assert first.status_code == 200
+    tag = first.headers["etag"]
+    assert client.get("/events", headers={"If-None-Match": tag}).status_code == 304
+
+    modules.storage.backend().store("autobrr", release(2))
+    changed = client.get("/events", headers={"If-None-Match": tag})
+    assert changed.status_code == 200
+    assert "Movie.2.2020" in changed.text
+
+
+def test_dashboard_page(client):
+    response = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert client.get("/", headers={"If-None-Match": response.headers["etag"]}).status_code == 304
+
+
+def test_shutdown_flushes_timelines(db, monkeypatch):
+    monkeypatch.setattr(modules.timeline, "_buffer", [])
+    monkeypatch.setattr(modules.timeline, "FLUSH_SECONDS", 3600.0)
+    monkeypatch.setattr(modules.timeline, "_last_flush", time.monotonic())
+    with TestClient(api_server.app):
+        modules.timeline.Timeline("e1").finish("rejected")
+        assert modules.timeline._buffer
+    assert not modules.timeline._buffer
+    assert modules.timeline.report()["events"] == 1
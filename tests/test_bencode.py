@@ -0,0 +1,78 @@
+import base64
+import hashlib
+
+import pytest
+
+import modules.bencode as bencode
+
+
+def make_torrent(**info):
+    fields = {"name": b"Some.Movie.2025.1080p-GRP", "piece length": 1 << 20,
+              "pieces": b"x" * 40, "length": 123}
+    fields.update(info)
+    fields = {k: v for k, v in fields.items() if v is not None}
+    return bencode.encode({"announce": b"http://t/a", "info": fields})
+
+
+def test_roundtrip_and_infohash():
+    buf = make_torrent()
+    info = bencode.torrent_info(buf)
+    expected = hashlib.sha1(bencode.encode(bencode.decode(buf)["info"])).hexdigest()
+    assert info["infohash"] == expected
+    assert info["name"] == "Some.Movie.2025.1080p-GRP"
+    assert info["piece_count"] == 2
+    assert info["total_size"] == 123
+
+
+def test_multi_file():
+    buf = make_torrent(length=None, files=[{"path": [b"a", b"b.mkv"], "length": 5},
+                                           {"path": [b"c.nfo"], "length": 7}])
+    info = bencode.torrent_info(buf)
+    assert info["total_size"] == 12
+    assert [f["path"] for f in info["files"]] == ["Some.Movie.2025.1080p-GRP/a/b.mkv",
+                                                  "Some.Movie.2025.1080p-GRP/c.nfo"]
+
+
+@pytest.mark.parametrize("buf", [b"", b"i12", b"d4:spam", b"5:ab", b"x", b"i1ei2e", b"l" * 100 + b"e" * 100])
+def test_malformed_bencode(buf):
+    with pytest.raises(bencode.BencodeError):
+        bencode.decode(buf)
+
+
+@pytest.mark.parametrize("info", [
+    {"files": [5]},
+    {"files": 5},
+    {"files": [{"path": [b"a"], "length": b"12"}]},
+    {"files": [{"path": b"a", "length": 1}]},
+    {"length": b"12"},
+    {"name": 7},
+    {"pieces": 3},
+])
+def test_wrong_types_raise_bencode_error(info):
+    with pytest.raises(bencode.BencodeError):
+        bencode.torrent_info(make_torrent(**info))
+
+
+def test_missing_info_dict():
+    with pytest.raises(bencode.BencodeError):
+        bencode.torrent_info(bencode.encode({"announce": b"x"}))
+
+
+def test_load_payload_torrent(tmp_path):
+    buf = make_torrent()
+    raw = {"TorrentDataRawBytes": base64.b64encode(buf).decode()}
+    assert bytes(bencode.load_payload_torrent(raw)) == buf
+
+    path = tmp_path / "x.torrent"
+    path.write_bytes(buf)
+    mapped = bencode.load_payload_torrent({"TorrentTmpFile": str(path)})
+    assert bencode.torrent_info(mapped)["name"] == "Some.Movie.2025.1080p-GRP"
+    mapped.close()
+
+    assert bencode.load_payload_torrent({"TorrentTmpFile": str(tmp_path / "missing")}) is None
+
+
+def test_verify_payload_size_mismatch():
+    info = bencode.torrent_info(make_torrent())
+    assert bencode.verify_payload(info, {"Size": 123})["status"] == "ok"
+    assert bencode.verify_payload(info, {"Size": 999999})["status"] != "ok"
@@ -0,0 +1,77 @@
+import asyncio
+import time
+import tracemalloc
+
+import pytest
+
+import modules.debug as debug
+
+
+@pytest.fixture(autouse=True)
+def clean_tracing():
+    debug.stop_tracing()
+    yield
+    debug.stop_tracing()
+
+
+def test_snapshot_and_diff():
+    first = debug.take_snapshot()
+    junk = [bytearray(1024) for _ in range(200)]
+    second = debug.take_snapshot()
+    diff = debug.diff_snapshots(first["id"], second["id"])
+    assert tracemalloc.is_tracing()
+    assert diff["top"] and "size_diff_kb" in diff["top"][0]
+    del junk
+
+
+def test_diff_unknown_snapshot():
+    with pytest.raises(KeyError):
+        debug.diff_snapshots(1000, 1001)
+
+
+def test_snapshots_are_bounded():
+    ids = [debug.take_snapshot(limit=1)["id"] for _ in range(debug.MAX_SNAPSHOTS + 2)]
+    assert sorted(debug._snapshots) == ids[-debug.MAX_SNAPSHOTS:]
+
+
+def test_tracing_stops_after_idle():
+    first = debug.take_snapshot(seconds=1.0)
+    assert tracemalloc.is_tracing()
+    deadline = time.monotonic() + 5
+    while tracemalloc.is_tracing() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not tracemalloc.is_tracing()
+    assert first["id"] in debug._snapshots
+
+
+def test_stop_tracing_clears():
+    debug.take_snapshot()
+    debug.stop_tracing()
+    assert not tracemalloc.is_tracing()
+    assert not debug._snapshots
+    assert debug._trace_timer is None
+
+
+def test_sample_profile_collapsed_stacks():
+    report = asyncio.run(debug.sample_profile(0.1, 0.01))
+    lines = report.strip().splitlines()
+    assert lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+
+
+def test_one_capture_at_a_time():
+    async def run():
+        first = asyncio.create_task(debug.sample_profile(0.3))
+        await asyncio.sleep(0.05)
+        with pytest.raises(debug.DebugBusyError):
+            await debug.cprofile(0.1)
+        await first
+
+    asyncio.run(run())
+
+
+def test_dump_tasks():
+    async def run():
+        asyncio.create_task(asyncio.sleep(1), name="sleeper")
+        return debug.dump_tasks()
+
+    assert "sleeper" in asyncio.run(run())
@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+
+import modules.feed
+
+
+def store(db, n):
+    db.store_json("test", {"TorrentName": f"Movie.{n}.2020.1080p-GRP", "Indexer": "idx"})
+
+
+@pytest.fixture
+def feed(db, monkeypatch):
+    monkeypatch.setattr(modules.feed, "POLL_SECONDS", 0.05)
+    return modules.feed.EventFeed()
+
+
+async def take(stream, count):
+    rows = []
+    async for row in stream:
+        if row is not None:
+            rows.append(row)
+            if len(rows) == count:
+                break
+    return rows
+
+
+def test_backlog_then_live(db, feed):
+    for n in range(3):
+        store(db, n)
+
+    async def run():
+        stream = feed.subscribe(since_id=1)
+        backlog = await take(stream, 2)
+        store(db, 3)
+        feed.notify()
+        live = await asyncio.wait_for(take(stream, 1), 2)
+        await stream.aclose()
+        return backlog + live
+
+    rows = asyncio.run(run())
+    assert [r["id"] for r in rows] == [2, 3, 4]
+    assert rows[-1]["title"] == "Movie.3.2020.1080p-GRP"
+
+
+def test_broadcast_survives_errors(db, feed, monkeypatch):
+    real = db.fetch_events_since
+    failures = [RuntimeError("database is locked")]
+
+    def flaky(since_id, limit):
+        if failures and since_id > 0:
+            raise failures.pop()
+        return real(since_id, limit)
+
+    async def run():
+        stream = feed.subscribe(since_id=0)
+        await take(stream, 1)
+        monkeypatch.setattr(db, "fetch_events_since", flaky)
+        store(db, 1)
+        feed.notify()
+        row = await asyncio.wait_for(take(stream, 1), 2)
+        await stream.aclose()
+        assert not feed.task.done()
+        return row
+
+    store(db, 0)
+    assert [r["id"] for r in asyncio.run(run())] == [2]
+    assert not failures
+
+
+def test_subscribe_restarts_dead_broadcaster(db, feed):
+    store(db, 0)
+
+    async def run():
+        stream = feed.subscribe(since_id=0)
+        await take(stream, 1)
+        await stream.aclose()
+        dead = feed.task
+        dead.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await dead
+
+        stream = feed.subscribe(since_id=1)
+        pending = asyncio.ensure_future(take(stream, 1))
+        await asyncio.sleep(0.01)
+        store(db, 1)
+        feed.notify()
+        rows = await asyncio.wait_for(pending, 2)
+        await stream.aclose()
+        return dead, rows
+
+    dead, rows = asyncio.run(run())
+    assert dead.done() and feed.task is not dead
+    assert [r["id"] for r in rows] == [2]
+
+
+def test_concurrent_subscribers_share_one_broadcaster(db, feed):
+    store(db, 0)
+
+    async def run():
+        streams = [feed.subscribe(since_id=0) for _ in range(3)]
+        rows = await asyncio.wait_for(asyncio.gather(*(take(s, 1) for s in streams)), 2)
+        broadcasters = [t for t in asyncio.all_tasks() if t.get_coro().__name__ == "_broadcast"]
+        for stream in streams:
+            await stream.aclose()
+        return rows, broadcasters
+
+    rows, broadcasters = asyncio.run(run())
+    assert [[r["id"] for r in batch] for batch in rows] == [[1], [1], [1]]
+    assert broadcasters == [feed.task]
@@ -0,0 +1,58 @@
+import pytest
+
+import modules.filters as filters
+
+
+def files(*paths):
+    return [{"path": p, "length": 1} for p in paths]
+
+
+def release(**extra):
+    return dict({"TorrentName": "Movie.2020.1080p-GRP", "Seeders": 50, "Resolution": "1080p"}, **extra)
+
+
+@pytest.mark.parametrize("paths, expected", [
+    (("Show/Show.S01E01.mkv", "Show/Show.S01E02.mkv"), True),
+    (("Show/Show.s01e01.mkv", "Show/sample/Show.S01E01.sample.mkv"), False),
+    (("Show/Show.S01E01.mkv", "Show/Show.S01E02.nfo"), False),
+    (("Movie.2020.1080p.mkv",), False),
+])
+def test_is_season_pack(paths, expected):
+    assert filters.is_season_pack(files(*paths)) is expected
+
+
+@pytest.mark.parametrize("paths, expected", [
+    (("Movie/Sample/movie.mkv", "Movie/movie-sample.mp4"), True),
+    (("Movie/Sample/movie.mkv", "Movie/movie.mkv"), False),
+    (("Movie/samples.mkv",), False),
+    (("Movie/sample.nfo",), False),
+    ((), False),
+])
+def test_is_sample_only(paths, expected):
+    assert filters.is_sample_only(files(*paths)) is expected
+
+
+def test_check_accepts():
+    assert filters.check(release(), {"min_seeders": 5, "quality": ["1080p"]}) == {"status": "accepted"}
+    # missing fields are not held against the release
+    assert filters.check({"TorrentName": "x"}, {"min_seeders": 5, "quality": ["1080p"]})["status"] == "accepted"
+
+
+@pytest.mark.parametrize("payload, rules, reason", [
+    (release(Seeders=2), {"min_seeders": 5}, "Seeders 2 below minimum 5"),
+    (release(Resolution="720p"), {"quality": ["1080p", "2160p"]}, "Resolution 720p not in"),
+])
+def test_check_rejects(payload, rules, reason):
+    verdict = filters.check(payload, rules)
+    assert verdict["status"] == "rejected"
+    assert verdict["reason"].startswith(reason)
+
+
+def test_check_file_list_rules():
+    pack = {"files": files("S.S01E01.mkv", "S.S01E02.mkv")}
+    sample = {"files": files("Movie/sample.mkv")}
+    assert filters.check(release(), {}, torrent=pack)["reason"] == "Season pack"
+    assert filters.check(release(), {}, torrent=sample)["reason"] == "Sample-only release"
+    assert filters.check(release(), {"reject_season_packs": False}, torrent=pack)["status"] == "accepted"
+    assert filters.check(release(), {"reject_samples": False}, torrent=sample)["status"] == "accepted"
+    assert filters.check(release(), {}, torrent=None)["status"] == "accepted"
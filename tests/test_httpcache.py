@@ -0,0 +1,131 @@
+import os
+
+import fastapi
+import pytest
+from fastapi.testclient import TestClient
+
+import web.httpcache as httpcache
+
+
+BIG = "<p>" + "cached page " * 200 + "</p>"
+
+
+@pytest.fixture
+def site(tmp_path):
+    templates = tmp_path / "templates"
+    static = tmp_path / "static"
+    templates.mkdir()
+    static.mkdir()
+    (templates / "index.html").write_text("{{ x }}")
+    (static / "style.css").write_text("body { color: red; }\n" * 100)
+    (static / "logo.ico").write_bytes(b"\x00" * 2000)
+
+    pages = httpcache.PageCache(str(templates), salt="s")
+    assets = httpcache.StaticAssets(str(static))
+    state = {"version": 1, "renders": 0}
+
+    app = fastapi.FastAPI()
+    app.mount("/static", assets, name="static")
+
+    @app.get("/")
+    def index(request: fastapi.Request):
+        def render():
+            state["renders"] += 1
+            return BIG
+        return pages.respond(request, "index.html", state["version"], render)
+
+    return TestClient(app), assets, state
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, deflate, br", "gzip"),
+    ("br;q=0, gzip;q=0.5", "gzip"),
+    ("gzip;q=0", "identity"),
+    ("*", "gzip"),
+    ("", "identity"),
+    (None, "identity"),
+])
+def test_negotiate(header, expected):
+    assert httpcache.negotiate(header, {"identity": b"", "gzip": b""}) == expected
+
+
+def test_matches():
+    assert httpcache.matches('"abc-gzip"', "abc") == '"abc-gzip"'
+    assert httpcache.matches('W/"abc", "zzz"', "abc") == '"abc"'
+    assert httpcache.matches("*", "abc") == '"abc"'
+    assert httpcache.matches('"other"', "abc") is None
+    assert httpcache.matches(None, "abc") is None
+
+
+def test_small_bodies_are_not_compressed():
+    assert list(httpcache._variants(b"tiny")) == ["identity"]
+
+
+def test_page_rendered_once_per_version(site):
+    client, _, state = site
+    first = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert first.status_code == 200
+    assert first.headers["content-encoding"] == "gzip"
+    assert first.headers["etag"].endswith('-gzip"')
+    assert first.text == BIG
+
+    assert client.get("/", headers={"Accept-Encoding": "identity"}).text == BIG
+    assert state["renders"] == 1
+
+    state["version"] = 2
+    client.get("/")
+    assert state["renders"] == 2
+
+
+def test_page_revalidation(site):
+    client, _, state = site
+    tag = client.get("/", headers={"Accept-Encoding": "gzip"}).headers["etag"]
+    cached = client.get("/", headers={"If-None-Match": tag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == tag
+
+    state["version"] = 2
+    assert client.get("/", headers={"If-None-Match": tag}).status_code == 200
+
+
+def test_static_fingerprinted_url_is_immutable(site):
+    client, assets, _ = site
+    url = assets.url("style.css")
+    assert url.startswith("/static/style.css?v=")
+    response = client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert "immutable" in response.headers["cache-control"]
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.text.startswith("body { color: red; }")
+
+    stale = client.get("/static/style.css?v=old")
+    assert stale.headers["cache-control"] == "no-cache"
+
+
+def test_static_compressed_revalidation(site):
+    client, assets, _ = site
+    url = assets.url("style.css")
+    tag = client.get(url, headers={"Accept-Encoding": "gzip"}).headers["etag"]
+    again = client.get(url, headers={"Accept-Encoding": "gzip", "If-None-Match": tag})
+    assert again.status_code == 304
+
+
+def test_static_binary_not_compressed(site):
+    client, assets, _ = site
+    response = client.get(assets.url("logo.ico"), headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+
+
+def test_missing_asset(site):
+    client, assets, _ = site
+    assert assets.url("missing.css") == "/static/missing.css"
+    assert client.get("/static/missing.css").status_code == 404
+
+
+def test_fingerprint_changes_with_content(site, tmp_path):
+    _, assets, _ = site
+    before, salt = assets.url("style.css"), assets.salt()
+    path = tmp_path / "static" / "style.css"
+    path.write_text("body { color: blue; }")
+    os.utime(path, ns=(1, 1))
+    assert assets.url("style.css") != before
+    assert assets.salt() != salt
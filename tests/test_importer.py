@@ -0,0 +1,65 @@
+import os
+
+import pytest
+
+import modules.importer as importer
+import modules.json
+
+
+def write_events(directory, count, start=0):
+    for n in range(start, start + count):
+        payload = {"TorrentName": f"Movie.{n}.2020.1080p.BluRay.x264-GRP", "Indexer": "idx",
+                   "TorrentUrl": f"http://t/{n}"}
+        modules.json.dump(payload, os.path.join(directory, f"autobrr_event_{n:05d}.json"))
+
+
+def count_events(db):
+    return len(db.fetch_json(limit=10000))
+
+
+def test_normalize_maps_legacy_keys():
+    payload = importer.normalize({"releaseName": "Heat.1995.1080p.BluRay.x264-GRP",
+                                  "IMDB": "tt0113277", "Codec": '["x264"]'}, "ts")
+    assert payload["TorrentName"] == "Heat.1995.1080p.BluRay.x264-GRP"
+    assert payload["MetaIMDB"] == "tt0113277"
+    assert payload["Codec"] == ["x264"]
+    assert payload["Resolution"] == "1080p"
+    assert payload["timestamp"] == "ts"
+
+
+def test_scan_orders_and_filters(tmp_path):
+    write_events(tmp_path, 3)
+    (tmp_path / "notes.txt").write_text("x")
+    assert importer.scan(tmp_path) == [f"autobrr_event_{n:05d}.json" for n in range(3)]
+    assert importer.scan(tmp_path, after="autobrr_event_00000.json") == \
+        ["autobrr_event_00001.json", "autobrr_event_00002.json"]
+
+
+def test_import_counts_bad_files(db, tmp_path):
+    write_events(tmp_path, 5)
+    (tmp_path / "autobrr_event_99999.json").write_text("{not json")
+    summary = importer.import_dir(str(tmp_path), workers=1)
+    assert summary["inserted"] == 5
+    assert summary["errors"] == 1
+    assert count_events(db) == 5
+
+
+def test_import_resumes_from_checkpoint(db, tmp_path):
+    write_events(tmp_path, 4)
+    assert importer.import_dir(str(tmp_path), workers=1)["inserted"] == 4
+
+    write_events(tmp_path, 2, start=4)
+    summary = importer.import_dir(str(tmp_path), workers=1)
+    assert summary["files"] == 6
+    assert summary["inserted"] == 6
+    assert count_events(db) == 6
+    assert importer.load_checkpoint(str(tmp_path / ".import_checkpoint.json"))["last"] == \
+        "autobrr_event_00005.json"
+
+
+def test_import_deduplicates(db, tmp_path):
+    write_events(tmp_path, 3)
+    importer.import_dir(str(tmp_path), workers=1)
+    os.remove(tmp_path / ".import_checkpoint.json")
+    assert importer.import_dir(str(tmp_path), workers=1)["inserted"] == 0
+    assert count_events(db) == 3
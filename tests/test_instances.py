@@ -0,0 +1,108 @@
+import asyncio
+import time
+
+import pytest
+
+import modules.config
+import modules.instances as instances
+import modules.scheduler
+
+
+@pytest.fixture
+def configure(monkeypatch):
+    monkeypatch.setattr(instances, "_instances", {})
+    monkeypatch.setattr(modules.scheduler, "_upstreams", {})
+    monkeypatch.setattr(modules.config, "SCHEDULER", {"radarr": {"rate": 1000, "burst": 100}})
+
+    def apply(service, section):
+        monkeypatch.setattr(modules.config, "config", {service: section})
+
+    return apply
+
+
+RADARRS = {"instances": [
+    {"name": "hd", "host": "http://hd", "match": {"resolution": ["1080p", "720p"]}},
+    {"name": "uhd", "host": "http://uhd", "match": {"resolution": ["2160p"], "indexer": ["beyond*"]}},
+    {"name": "other", "host": "http://other"},
+]}
+
+
+def names(group):
+    return [i.name for i in group]
+
+
+def test_single_host_section(configure):
+    configure("radarr", {"host": "http://radarr", "apikey": "k"})
+    [only] = instances.instances("radarr")
+    assert (only.name, only.host, only.key) == ("default", "http://radarr", "radarr:default")
+    assert instances.instances("qbittorrent") == []
+
+
+def test_route_by_rules(configure):
+    configure("radarr", RADARRS)
+    assert names(instances.route("radarr", {"Resolution": "1080P"})) == ["hd"]
+    assert names(instances.route("radarr", {"Resolution": "2160p", "Indexer": "BeyondHD"})) == ["uhd"]
+    # every key of a rule must match; unclaimed payloads go to unruled instances
+    assert names(instances.route("radarr", {"Resolution": "2160p", "Indexer": "other"})) == ["other"]
+    assert names(instances.route("radarr")) == ["hd", "uhd", "other"]
+
+
+def test_pick_least_outstanding_and_healthy(configure):
+    configure("radarr", {"instances": [{"name": "a", "host": "http://a"}, {"name": "b", "host": "http://b"}]})
+    a, b = instances.instances("radarr")
+    a.outstanding = 3
+    assert instances.pick("radarr") is b
+    b.upstream.breaker._open(time.monotonic())
+    assert instances.pick("radarr") is a
+    a.upstream.breaker._open(time.monotonic())
+    with pytest.raises(instances.NoInstanceError) as error:
+        instances.pick("radarr")
+    assert 0 < error.value.retry_after <= modules.scheduler.DEFAULT_LIMITS["cooldown"]
+
+
+def test_limits_inherit_and_override(configure, monkeypatch):
+    monkeypatch.setattr(modules.config, "SCHEDULER", {"radarr": {"concurrency": 7}, "radarr:b": {"concurrency": 1}})
+    configure("radarr", {"instances": [{"name": "a", "host": "http://a"}, {"name": "b", "host": "http://b"}]})
+    a, b = instances.instances("radarr")
+    assert a.upstream.slots._value == 7
+    assert b.upstream.slots._value == 1
+
+
+def test_call_passes_instance_and_tracks_load(configure):
+    configure("radarr", {"host": "http://radarr"})
+    [radarr] = instances.instances("radarr")
+    seen = []
+
+    async def job(value, instance=None):
+        seen.append((value, instance, instance.outstanding))
+        return value * 2
+
+    assert asyncio.run(radarr.call(job, 21)) == 42
+    assert seen == [(21, radarr, 1)]
+    assert radarr.outstanding == 0
+
+
+def test_fan_out_collects_exceptions(configure):
+    configure("radarr", RADARRS)
+
+    async def job(instance=None):
+        if instance.name == "uhd":
+            raise RuntimeError("down")
+        return instance.name
+
+    results = asyncio.run(instances.fan_out("radarr", job))
+    assert [i.name for i, _ in results] == ["hd", "uhd", "other"]
+    assert results[0][1] == "hd"
+    assert isinstance(results[1][1], RuntimeError)
+
+
+def test_status(configure):
+    configure("radarr", {"host": "http://radarr"})
+    instances.instances("radarr")
+    assert instances.status() == {"radarr": {"default": {"host": "http://radarr", "state": "closed", "outstanding": 0}}}
+
+
+def test_unknown_match_key_rejected(configure):
+    configure("radarr", {"instances": [{"name": "hd", "host": "http://hd", "match": {"quality": ["1080p"]}}]})
+    with pytest.raises(ValueError, match="quality"):
+        instances.instances("radarr")
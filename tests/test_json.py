@@ -0,0 +1,72 @@
+import json
+import os
+import stat
+
+import pytest
+
+import modules.json
+
+
+def mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def test_roundtrip():
+    data = {"TorrentName": "Amélie.2001.1080p-GRP", "Size": 4788888535, "Tags": ["a", None, True]}
+    assert modules.json.decode(modules.json.encode(data)) == data
+    assert json.loads(modules.json.encode_str(data)) == data
+
+
+def test_encode_falls_back_for_unusual_values():
+    data = {1: "int key", "big": 2 ** 70}
+    assert json.loads(modules.json.encode(data)) == {"1": "int key", "big": 2 ** 70}
+
+
+@pytest.mark.parametrize("source", [b'{"a": 1}', bytearray(b'{"a": 1}'), memoryview(b'{"a": 1}'), '{"a": 1}'])
+def test_decode_inputs(source):
+    assert modules.json.decode(source) == {"a": 1}
+
+
+@pytest.mark.parametrize("bad", [b"{", b"", b"{'a': 1}", b"\xff"])
+def test_decode_error(bad):
+    with pytest.raises(modules.json.DecodeError):
+        modules.json.decode(bad)
+
+
+def test_stringify_indent():
+    assert modules.json.stringify({"a": 1}, indent=None) == '{"a":1}'
+    assert json.loads(modules.json.stringify({"a": [1, 2]})) == {"a": [1, 2]}
+    assert "\n    " in modules.json.stringify({"a": 1}, indent=4)
+
+
+def test_dump_is_atomic_and_readable(tmp_path):
+    path = tmp_path / "config.json"
+    modules.json.dump({"a": 1}, str(path))
+    assert modules.json.load(str(path)) == {"a": 1}
+    assert [p.name for p in tmp_path.iterdir()] == ["config.json"]
+
+
+def test_dump_keeps_existing_mode(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text("{}")
+    os.chmod(path, 0o640)
+    modules.json.dump({"a": 1}, str(path))
+    assert mode(path) == 0o640
+
+
+def test_dump_new_file_follows_umask(tmp_path):
+    old = os.umask(0o022)
+    try:
+        modules.json.dump({"a": 1}, str(tmp_path / "new.json"))
+    finally:
+        os.umask(old)
+    assert mode(tmp_path / "new.json") == 0o644
+
+
+def test_dump_failure_leaves_original(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text('{"a": 1}')
+    with pytest.raises(TypeError):
+        modules.json.dump({"a": object()}, str(path))
+    assert modules.json.load(str(path)) == {"a": 1}
+    assert [p.name for p in tmp_path.iterdir()] == ["config.json"]
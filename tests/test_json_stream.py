@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+
+import modules.json
+
+
+async def chunked(body, size):
+    for i in range(0, len(body), size):
+        yield body[i:i + size]
+
+
+def records(body, size=7):
+    async def collect():
+        return [r async for r in modules.json.iter_records(chunked(body, size))]
+    return asyncio.run(collect())
+
+
+def errors(body):
+    return [(index, error) for index, _, error in records(body) if error]
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 4096])
+def test_array_any_chunking(size):
+    body = b'[{"a": 1}, {"b": "],\\"x"}, {"c": [1, {"d": 2}]}]'
+    assert records(body, size) == [(0, {"a": 1}, None), (1, {"b": '],"x'}, None),
+                                   (2, {"c": [1, {"d": 2}]}, None)]
+
+
+def test_empty_array_and_body():
+    assert records(b"  [ ] ") == []
+    assert records(b"") == []
+
+
+def test_doubled_comma_is_a_record_error():
+    out = records(b'[{"a": 1},,{"b": 2}]')
+    assert [r for _, r, _ in out] == [{"a": 1}, None, {"b": 2}]
+    assert errors(b'[{"a": 1},,{"b": 2}]')[0][0] == 1
+
+
+def test_missing_comma_is_a_record_error():
+    out = records(b'[{"a": 1} {"b": 2}, {"c": 3}]')
+    assert out[0] == (0, {"a": 1}, None)
+    assert out[1][0] == 1 and out[1][2].startswith("Expected ','")
+    assert out[2] == (2, {"c": 3}, None)
+
+
+def test_malformed_record_does_not_truncate():
+    out = records(b'[{"a": 1}, {"b": }, {"c": 3}, {"d": 4}]')
+    assert [r for _, r, _ in out] == [{"a": 1}, None, {"c": 3}, {"d": 4}]
+    assert out[1][2].startswith("Invalid JSON")
+
+
+def test_trailing_comma():
+    assert errors(b'[{"a": 1},]') == [(1, "Trailing ',' before ']'")]
+
+
+def test_trailing_garbage():
+    out = records(b'[{"a": 1}] {"b": 2}')
+    assert out == [(0, {"a": 1}, None), (1, None, "Unexpected data after JSON array")]
+
+
+def test_unterminated_array():
+    assert errors(b'[{"a": 1}, {"b": 2}') == [(2, "Unterminated JSON array")]
+    assert errors(b'[{"a": 1}, {"b":') == [(1, "Invalid JSON: Expecting value"),
+                                           (2, "Unterminated JSON array")]
+
+
+def test_numbers_are_not_split_across_chunks():
+    assert [r for _, r, _ in records(b"[1, 23, 4567]", size=2)] == [1, 23, 4567]
+
+
+def test_ndjson_errors_per_line():
+    out = records(b'{"a": 1}\n{bad\n\n{"c": 3}')
+    assert [r for _, r, _ in out] == [{"a": 1}, None, {"c": 3}]
+    assert out[1][2].startswith("Invalid JSON")
+
+
+def test_record_size_cap(monkeypatch):
+    monkeypatch.setattr(modules.json, "MAX_RECORD_BYTES", 16)
+    out = records(b'[{"a": "' + b"x" * 64 + b'"}]')
+    assert out[-1][2] == "Record exceeds 16 bytes"
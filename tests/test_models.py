@@ -0,0 +1,29 @@
+import pytest
+
+from modules.models import AutoBRRPayload
+
+
+def test_coerces_macro_strings():
+    payload = AutoBRRPayload(**{"Codec": "[]", "Audio": '["DDP5.1"]', "Other": "HDR",
+                                "Size": "4.8 GB", "Bytes": 4788888535, "IMDB": "tt0113277"})
+    assert payload.Codec == []
+    assert payload.Audio == ["DDP5.1"]
+    assert payload.Other == ["HDR"]
+    assert (payload.SizeString, payload.Size) == ("4.8 GB", 4788888535)
+    assert payload.MetaIMDB == "tt0113277"
+
+
+def test_current_keys_win_over_legacy():
+    payload = AutoBRRPayload(**{"TorrentName": "new", "releaseName": "old"})
+    assert payload.TorrentName == "new"
+
+
+def test_input_not_modified():
+    raw = {"Size": "4.8 GB"}
+    AutoBRRPayload(**raw)
+    assert raw == {"Size": "4.8 GB"}
+
+
+def test_still_validates():
+    with pytest.raises(ValueError):
+        AutoBRRPayload(**{"Seeders": "many"})
@@ -0,0 +1,151 @@
+import asyncio
+import base64
+
+import pytest
+
+import modules.bencode
+import modules.prefetch as prefetch
+
+
+def torrent(name="Movie.2020.1080p-GRP"):
+    return modules.bencode.encode({"info": {"name": name, "piece length": 1 << 20,
+                                            "pieces": b"x" * 20, "length": 10}})
+
+
+def infohash(data):
+    return modules.bencode.torrent_info(data)["infohash"]
+
+
+@pytest.fixture
+def fetcher(tmp_path, monkeypatch):
+    engine = prefetch.Prefetcher({"path": str(tmp_path / "cache"), "timeout": 1.0})
+    engine.fetches = []
+
+    async def fake_fetch(url):
+        engine.fetches.append(url)
+        await asyncio.sleep(0.05)
+        data = torrent(url)
+        engine.cache.put(infohash(data), data, url)
+        return data
+
+    monkeypatch.setattr(engine, "_fetch", fake_fetch)
+    return engine
+
+
+def payload(url="http://t/1", **extra):
+    return dict({"TorrentName": "Movie", "DownloadURL": url}, **extra)
+
+
+def test_shared_download_survives_duplicate_cancel(fetcher):
+    async def run():
+        accepted, duplicate = payload(), payload()
+        fetcher.start(accepted)
+        fetcher.start(duplicate)
+        fetcher.cancel(duplicate)
+        return await fetcher.torrent_bytes(accepted)
+
+    assert asyncio.run(run()) == torrent("http://t/1")
+    assert fetcher.fetches == ["http://t/1"]
+
+
+def test_last_holder_cancels_download(fetcher):
+    async def run():
+        first, second = payload(), payload()
+        fetcher.start(first)
+        fetcher.start(second)
+        task = fetcher.pending["http://t/1"]
+        fetcher.cancel(first)
+        fetcher.cancel(second)
+        await asyncio.sleep(0)
+        return task
+
+    assert asyncio.run(run()).cancelled()
+    assert not fetcher.pending and not fetcher.holders
+
+
+def test_cancelled_download_falls_back_to_url(fetcher):
+    async def run():
+        item = payload()
+        fetcher.start(item)
+        waiting = asyncio.create_task(fetcher.torrent_bytes(item))
+        await asyncio.sleep(0.01)
+        fetcher.pending["http://t/1"].cancel()
+        return await waiting
+
+    assert asyncio.run(run()) is None
+
+
+def test_grab_cancellation_propagates(fetcher):
+    async def run():
+        item = payload()
+        fetcher.start(item)
+        download = fetcher.pending["http://t/1"]
+        grab = asyncio.create_task(fetcher.torrent_bytes(item))
+        await asyncio.sleep(0.01)
+        grab.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await grab
+        return await download
+
+    assert asyncio.run(run()) == torrent("http://t/1")
+
+
+def test_attached_torrent_skips_prefetch(fetcher, tmp_path):
+    tmp = tmp_path / "attached.torrent"
+    tmp.write_bytes(torrent())
+
+    async def run():
+        fetcher.start(payload(TorrentTmpFile=str(tmp)))
+        fetcher.start(payload("http://t/2", TorrentDataRawBytes=base64.b64encode(torrent()).decode()))
+        fetcher.start(payload("http://t/3", TorrentTmpFile="/nonexistent/elsewhere.torrent"))
+        await asyncio.gather(*fetcher.pending.values())
+
+    asyncio.run(run())
+    assert fetcher.fetches == ["http://t/3"]
+
+
+def test_cached_by_hash(fetcher):
+    data = torrent()
+    fetcher.cache.put(infohash(data), data)
+
+    async def run():
+        item = payload("http://t/other", TorrentHash=infohash(data).upper())
+        fetcher.start(item)
+        return await fetcher.torrent_bytes(item)
+
+    assert asyncio.run(run()) == data
+    assert fetcher.fetches == []
+
+
+def test_url_index_survives_restart(tmp_path):
+    directory = str(tmp_path / "cache")
+    data = torrent()
+    prefetch.TorrentCache(directory, 1 << 20).put(infohash(data), data, "http://t/1")
+
+    cache = prefetch.TorrentCache(directory, 1 << 20)
+    assert cache.get_url("http://t/1") == data
+    assert cache.has(url="http://t/1")
+
+
+def test_url_index_drops_evicted(tmp_path):
+    directory = str(tmp_path / "cache")
+    cache = prefetch.TorrentCache(directory, 1)
+    first, second = torrent("a"), torrent("b")
+    cache.put(infohash(first), first, "http://t/a")
+    cache.put(infohash(second), second, "http://t/b")
+
+    reopened = prefetch.TorrentCache(directory, 1 << 20)
+    assert reopened.get_url("http://t/a") is None
+    assert reopened.get_url("http://t/b") == second
+
+
+def test_url_index_compacts(tmp_path, monkeypatch):
+    monkeypatch.setattr(prefetch, "URL_INDEX_LIMIT", 2)
+    directory = str(tmp_path / "cache")
+    cache = prefetch.TorrentCache(directory, 1 << 20)
+    data = torrent()
+    for n in range(10):
+        cache.put(infohash(data), data, f"http://t/{n}")
+    with open(cache.index_path) as f:
+        assert len(f.readlines()) <= 4
+    assert list(prefetch.TorrentCache(directory, 1 << 20).urls) == ["http://t/8", "http://t/9"]
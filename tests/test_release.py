@@ -0,0 +1,102 @@
+import pytest
+
+import modules.release as release
+
+
+def test_full_name():
+    parsed = release.parse("Dune.Part.Two.2024.2160p.UHD.BluRay.REMUX.DV.HDR.TrueHD.7.1.Atmos.HEVC-FraMeSToR")
+    assert parsed["title"] == "Dune Part Two"
+    assert parsed["year"] == 2024
+    assert parsed["resolution"] == "2160p"
+    assert parsed["source"] == "BluRay"
+    assert parsed["codec"] == "H.265"
+    assert parsed["hdr"] == ["DV", "HDR"]
+    assert parsed["group"] == "FraMeSToR"
+
+
+def test_hyphenated_source_is_not_group():
+    parsed = release.parse("Heat.1995.1080p.AMZN.WEB-DL")
+    assert parsed["source"] == "WEB-DL"
+    assert parsed["group"] is None
+
+
+@pytest.mark.parametrize("name, codec, group", [
+    ("Heat.1995.1080p.BluRay.x264-WEB", "x264", "WEB"),
+    ("Heat.1995.1080p.BluRay.x264-DV", "x264", "DV"),
+    ("Heat.1995.1080p.BluRay.H.264-HDR", "H.264", "HDR"),
+])
+def test_group_named_like_a_tag(name, codec, group):
+    parsed = release.parse(name)
+    assert parsed["codec"] == codec
+    assert parsed["group"] == group
+    assert parsed["hdr"] == []
+
+
+def test_group_with_separator_in_tail():
+    parsed = release.parse("Spider-Man.2002.1080p.BluRay.x264")
+    assert parsed["title"] == "Spider-Man"
+    assert parsed["group"] is None
+
+
+def test_title_containing_year():
+    parsed = release.parse("Blade.Runner.2049.2017.1080p.BluRay.x264-SPARKS")
+    assert parsed["title"] == "Blade Runner 2049"
+    assert parsed["year"] == 2017
+
+
+def test_title_is_a_year():
+    parsed = release.parse("2001.1968.1080p.BluRay.x264-GRP")
+    assert parsed["title"] == "2001"
+    assert parsed["year"] == 1968
+
+
+def test_spaced_separators_and_imdb():
+    parsed = release.parse("The Last Night 2020 tt1234567 720p WEBRip x265-GRP")
+    assert parsed["title"] == "The Last Night"
+    assert parsed["imdb"] == "tt1234567"
+    assert parsed["source"] == "WEBRip"
+
+
+def test_proper_and_repack():
+    assert release.parse("Heat.1995.PROPER.1080p.WEB.x264-GRP")["proper"] is True
+    assert release.parse("Heat.1995.REPACK.1080p.WEB.x264-GRP")["repack"] is True
+    assert release.parse("Heat.1995.1080p.WEB.x264-GRP")["proper"] is False
+
+
+def test_empty_and_unparseable():
+    assert release.parse("")["title"] == ""
+    parsed = release.parse("just some words")
+    assert parsed["title"] == "just some words"
+    assert parsed["year"] is None
+
+
+def test_parse_returns_fresh_copy():
+    name = "Heat.1995.1080p.BluRay.DV.x264-GRP"
+    release.parse(name)["hdr"].append("junk")
+    assert release.parse(name)["hdr"] == ["DV"]
+
+
+def test_normalize_fills_only_empty_fields():
+    payload = {"TorrentName": "Heat.1995.1080p.BluRay.x264-GRP", "Resolution": "720p",
+               "Year": 0, "Codec": []}
+    release.normalize_payload(payload)
+    assert payload["Resolution"] == "720p"
+    assert payload["Year"] == 1995
+    assert payload["Codec"] == ["x264"]
+    assert payload["Group"] == "GRP"
+    assert "Proper" not in payload
+
+
+def test_corpus_parses():
+    for name in release._corpus(500):
+        parsed = release.parse(name)
+        assert parsed["resolution"] and parsed["group"]
+
+
+def test_hyphenated_and_split_tags():
+    # Hyphenated tags and two-token splits classify as they did when
+    # hyphens were stripped from the whole name first.
+    parsed = release.parse("Heat.1995.1080p.Blu-Ray.DTS-HD.H.264-GRP")
+    assert (parsed["source"], parsed["codec"], parsed["group"]) == ("BluRay", "H.264", "GRP")
+    assert release.parse("Dark.Web.2019.1080p.WEB-DL-GRP")["title"] == "Dark Web"
+    assert release.parse("Dark.Web.2019.1080p.WEB-DL-GRP")["source"] == "WEB-DL"
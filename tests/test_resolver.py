@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+import modules.instances
+import modules.resolver as resolver
+
+
+class FakeRadarr:
+    def __init__(self, results=None, error=None):
+        self.results = results or []
+        self.error = error
+        self.calls = 0
+
+    async def call(self, func, title, year):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        if self.error:
+            raise self.error
+        return self.results
+
+
+@pytest.fixture
+def radarr(db, monkeypatch):
+    fake = FakeRadarr()
+    monkeypatch.setattr(modules.instances, "pick", lambda service, payload=None: fake)
+    return fake
+
+
+def movie(title, year, imdb):
+    return {"title": title, "year": year, "imdbId": imdb, "tmdbId": int(imdb[2:])}
+
+
+def test_normalize_title():
+    assert resolver.normalize_title("Amélie: The Movie!") == "amelie the movie"
+
+
+def test_pick_exact_title_and_year():
+    results = [movie("Heat", 1986, "tt0000001"), movie("Heat", 1995, "tt0113277")]
+    assert resolver._pick(results, "heat", 1995)["imdbId"] == "tt0113277"
+
+
+def test_pick_same_year_different_title_misses():
+    results = [movie("Toy Story", 1995, "tt0114709")]
+    assert resolver._pick(results, "heat", 1995) is None
+
+
+def test_pick_close_title_same_year():
+    results = [movie("Spider-Man", 2002, "tt0145487")]
+    assert resolver._pick(results, "spiderman", 2002)["imdbId"] == "tt0145487"
+
+
+def test_pick_without_year_matches_title():
+    results = [movie("Other", 2001, "tt0000002"), movie("Amelie", 2001, "tt0211915")]
+    assert resolver._pick(results, "amelie", 0)["imdbId"] == "tt0211915"
+    assert resolver._pick(results, "ameli", 0) is None
+
+
+def test_resolve_caches_hits(radarr):
+    radarr.results = [movie("Heat", 1995, "tt0113277")]
+    assert asyncio.run(resolver.resolve("Heat", 1995))["imdb_id"] == "tt0113277"
+    assert asyncio.run(resolver.resolve("heat", 1995))["imdb_id"] == "tt0113277"
+    assert radarr.calls == 1
+
+
+def test_resolve_joins_inflight(radarr):
+    radarr.results = [movie("Heat", 1995, "tt0113277")]
+
+    async def run():
+        return await asyncio.gather(*(resolver.resolve("Heat", 1995) for _ in range(5)))
+
+    assert {r["imdb_id"] for r in asyncio.run(run())} == {"tt0113277"}
+    assert radarr.calls == 1
+
+
+def test_resolve_outage_not_cached(radarr):
+    radarr.error = RuntimeError("radarr down")
+    assert asyncio.run(resolver.resolve("Heat", 1995)) == {"imdb_id": None, "tmdb_id": None}
+    radarr.error = None
+    radarr.results = [movie("Heat", 1995, "tt0113277")]
+    assert asyncio.run(resolver.resolve("Heat", 1995))["imdb_id"] == "tt0113277"
+
+
+def test_fill_payload_keeps_existing(radarr):
+    payload = {"Title": "Heat", "Year": 1995, "MetaIMDB": "tt9999999"}
+    assert asyncio.run(resolver.fill_payload(payload))["MetaIMDB"] == "tt9999999"
+    assert radarr.calls == 0
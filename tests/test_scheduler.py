@@ -0,0 +1,188 @@
+import asyncio
+import time
+
+import pytest
+
+import modules.scheduler as scheduler
+
+
+def limits(**overrides):
+    return dict(scheduler.DEFAULT_LIMITS, rate=1000.0, burst=100, **overrides)
+
+
+async def ok():
+    return "ok"
+
+
+async def fail():
+    raise ValueError("boom")
+
+
+def open_upstream(cooldown=0.0):
+    upstream = scheduler.Upstream("test", limits(min_requests=2, cooldown=cooldown))
+
+    async def trip():
+        for _ in range(2):
+            with pytest.raises(ValueError):
+                await upstream.call(fail)
+
+    asyncio.run(trip())
+    assert upstream.breaker.state == "open"
+    return upstream
+
+
+def test_breaker_opens_on_error_rate():
+    upstream = open_upstream(cooldown=60.0)
+    with pytest.raises(scheduler.CircuitOpenError):
+        asyncio.run(upstream.call(ok))
+    assert not upstream.breaker.available()
+
+
+def test_breaker_half_open_probe_closes():
+    upstream = open_upstream()
+    assert upstream.breaker.available()
+    assert asyncio.run(upstream.call(ok)) == "ok"
+    assert upstream.breaker.state == "closed"
+
+
+def test_breaker_failed_probe_reopens():
+    upstream = open_upstream()
+    with pytest.raises(ValueError):
+        asyncio.run(upstream.call(fail))
+    assert upstream.breaker.state == "open"
+
+
+def test_breaker_single_probe():
+    breaker = open_upstream().breaker
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    assert not breaker.allow()
+    assert not breaker.available()
+
+
+def test_cancelled_probe_is_released():
+    upstream = open_upstream()
+
+    async def run():
+        task = asyncio.create_task(upstream.call(asyncio.sleep, 10))
+        await asyncio.sleep(0.01)
+        assert upstream.breaker.probing
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert upstream.breaker.state == "half_open"
+    assert upstream.breaker.available()
+    assert asyncio.run(upstream.call(ok)) == "ok"
+    assert upstream.breaker.state == "closed"
+
+
+def test_token_bucket_limits_rate():
+    bucket = scheduler.TokenBucket(rate=50.0, burst=2)
+
+    async def run():
+        start = time.monotonic()
+        for _ in range(5):
+            await bucket.acquire()
+        return time.monotonic() - start
+
+    assert asyncio.run(run()) >= 0.05
+
+
+@pytest.mark.parametrize("pretime, seconds", [
+    ("45s", 45.0), ("2m30s", 150.0), ("1h", 3600.0), ("90", 90.0), ("", None), ("soon", None),
+])
+def test_pretime_seconds(pretime, seconds):
+    assert scheduler.pretime_seconds(pretime) == seconds
+
+
+def test_score_orders_freeleech_first():
+    assert scheduler.priority_class(scheduler.score({"Freeleech": True})) == "high"
+    assert scheduler.score({"Seeders": 1000}) == 25
+    assert scheduler.priority_class(scheduler.score({})) == "low"
+
+
+def test_scheduler_runs_by_priority():
+    order = []
+
+    async def job(name):
+        order.append(name)
+        return name
+
+    async def run():
+        grabs = scheduler.GrabScheduler(workers=1)
+        futures = [grabs.submit({"Seeders": 0}, job, "low"),
+                   grabs.submit({"Freeleech": True}, job, "high"),
+                   grabs.submit({"Seeders": 100}, job, "normal")]
+        return await asyncio.gather(*futures)
+
+    assert asyncio.run(run()) == ["low", "high", "normal"]
+    assert order == ["high", "normal", "low"]
+
+
+@pytest.fixture
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(scheduler, "RETRY_BACKOFF", 0.001)
+
+
+def test_scheduler_reports_job_errors(fast_retries):
+    async def run():
+        grabs = scheduler.GrabScheduler(workers=1)
+        result = await asyncio.wait_for(grabs.submit({}, fail), 1.0)
+        return grabs, result
+
+    grabs, result = asyncio.run(run())
+    assert result == {"status": "error", "reason": "boom"}
+    assert grabs.metrics()["retries"] == scheduler.RETRIES
+
+
+def test_failed_job_is_retried(fast_retries):
+    attempts = []
+
+    async def flaky():
+        attempts.append(time.monotonic())
+        if len(attempts) < 3:
+            raise ValueError("qbittorrent down")
+        return "added"
+
+    async def run():
+        grabs = scheduler.GrabScheduler(workers=1)
+        return await asyncio.wait_for(grabs.submit({}, flaky), 1.0)
+
+    assert asyncio.run(run()) == "added"
+    assert len(attempts) == 3
+
+
+def test_retry_waits_for_breaker_cooldown(fast_retries):
+    upstream = open_upstream(cooldown=0.2)
+    attempts = []
+
+    async def grab():
+        attempts.append(time.monotonic())
+        return await upstream.call(ok)
+
+    async def run():
+        grabs = scheduler.GrabScheduler(workers=1)
+        start = time.monotonic()
+        result = await asyncio.wait_for(grabs.submit({}, grab), 1.0)
+        return result, attempts[-1] - start
+
+    result, waited = asyncio.run(run())
+    assert result == "ok"
+    assert len(attempts) == 2
+    assert waited >= 0.15
+
+
+def test_cancelled_future_does_not_kill_worker():
+    async def run():
+        grabs = scheduler.GrabScheduler(workers=1)
+        first = grabs.submit({}, asyncio.sleep, 0.02, "first")
+        second = grabs.submit({}, fail)
+        first.cancel()
+        second.cancel()
+        result = await asyncio.wait_for(grabs.submit({}, ok), 1.0)
+        assert all(not t.done() for t in grabs.tasks)
+        return result
+
+    assert asyncio.run(run()) == "ok"
@@ -0,0 +1,127 @@
+import os
+import random
+import threading
+
+import pytest
+
+import modules.segmentlog as segmentlog
+
+
+def record(n):
+    return {"n": n, "body": "x" * 100}
+
+
+def test_append_and_get(tmp_path):
+    log = segmentlog.SegmentLog(str(tmp_path))
+    seqs = [log.append(record(n)) for n in range(10)]
+    assert seqs == list(range(10))
+    assert log.get(7) == record(7)
+    assert log.get(10) is None
+    assert log.get(-1) is None
+    log.close()
+
+
+def test_roll_and_read_sealed(tmp_path):
+    log = segmentlog.SegmentLog(str(tmp_path), segment_bytes=1024)
+    for n in range(50):
+        log.append(record(n))
+    sealed = log.sealed()
+    assert len(sealed) > 1
+    assert all(log.get(n) == record(n) for n in range(50))
+    assert [r["n"] for _, r in log.read_segment(sealed[0])] == list(range(sealed[0].count))
+    log.close()
+
+
+def test_reopen_keeps_sequence(tmp_path):
+    log = segmentlog.SegmentLog(str(tmp_path), segment_bytes=1024)
+    for n in range(30):
+        log.append(record(n))
+    log.close()
+
+    log = segmentlog.SegmentLog(str(tmp_path), segment_bytes=1024)
+    assert log.next_seq() == 30
+    assert log.append(record(30)) == 30
+    assert [seq for seq, _ in log.scan()] == list(range(31))
+    log.close()
+
+
+def test_torn_tail_is_truncated(tmp_path):
+    log = segmentlog.SegmentLog(str(tmp_path))
+    for n in range(3):
+        log.append(record(n))
+    path = log.segments[-1].log_path
+    log.close()
+
+    with open(path, "ab") as f:
+        f.write(segmentlog.RECORD.pack(500, 0) + b"partial")
+    size = os.path.getsize(path)
+
+    log = segmentlog.SegmentLog(str(tmp_path))
+    assert os.path.getsize(path) < size
+    assert log.next_seq() == 3
+    assert log.append(record(3)) == 3
+    assert log.get(3) == record(3)
+    log.close()
+
+
+def test_corrupt_record_stops_recovery(tmp_path):
+    log = segmentlog.SegmentLog(str(tmp_path))
+    for n in range(3):
+        log.append(record(n))
+    path = log.segments[-1].log_path
+    offset = log.active_offsets[1][0] + segmentlog.RECORD.size
+    log.close()
+
+    with open(path, "r+b") as f:
+        f.seek(offset)
+        f.write(b"!")
+
+    log = segmentlog.SegmentLog(str(tmp_path))
+    assert log.next_seq() == 1
+    log.close()
+
+
+def test_drop_removes_files(tmp_path):
+    log = segmentlog.SegmentLog(str(tmp_path), segment_bytes=1024)
+    for n in range(30):
+        log.append(record(n))
+    first = log.sealed()[0]
+    log.drop(first)
+    assert not os.path.exists(first.log_path)
+    assert log.first_seq() == first.base + first.count
+    assert log.get(0) is None
+    log.close()
+
+
+def test_get_races_drop(tmp_path):
+    log = segmentlog.SegmentLog(str(tmp_path), segment_bytes=512)
+    for n in range(400):
+        log.append(record(n))
+    errors = []
+
+    def reader():
+        rng = random.Random(1)
+        try:
+            for _ in range(5000):
+                n = rng.randrange(400)
+                result = log.get(n)
+                assert result is None or result == record(n)
+        except Exception as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=reader)
+    thread.start()
+    for segment in log.sealed():
+        log.drop(segment)
+    thread.join()
+    log.close()
+    assert errors == []
+
+
+def test_fsync_append(tmp_path, monkeypatch):
+    synced = []
+    monkeypatch.setattr(segmentlog.os, "fsync", synced.append)
+    log = segmentlog.SegmentLog(str(tmp_path), fsync=True)
+    log.append(record(0))
+    log.close()
+    assert len(synced) == 1
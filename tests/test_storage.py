@@ -0,0 +1,92 @@
+import pytest
+
+import modules.db
+import modules.storage as storage
+
+
+def payload(n):
+    return {"TorrentName": f"Movie.{n}.2020.1080p.WEB-DL-GRP", "Indexer": "idx", "event_id": f"ev{n}"}
+
+
+@pytest.fixture
+def segments(db, tmp_path):
+    backend = storage.SegmentLogBackend(str(tmp_path / "segments"), 1024, compact_interval=0)
+    yield backend
+    backend.close()
+
+
+def test_backend_is_abstract():
+    with pytest.raises(TypeError):
+        storage.StorageBackend()
+
+
+def test_sqlite_store_returns_row_id(db):
+    backend = storage.SQLiteBackend()
+    first = backend.store("test", payload(1))
+    assert first and backend.store("test", payload(2)) == first + 1
+    assert backend.store("test", payload(1)) is None
+    assert backend.seen(modules.db.event_key(payload(1)))
+    assert [p["event_id"] for p in backend.fetch()] == ["ev2", "ev1"]
+
+
+def test_segment_store_returns_seq(segments):
+    assert [segments.store("test", payload(n)) for n in range(3)] == [0, 1, 2]
+    assert segments.get(1)["event_id"] == "ev1"
+    assert segments.locate("ev2") == 2
+
+
+def test_segment_seen_before_compaction(segments):
+    key = modules.db.event_key(payload(1))
+    assert not segments.seen(key)
+    segments.store("test", payload(1))
+    assert segments.seen(key)
+    assert not modules.db.event_seen(key)
+
+
+def test_segment_seen_after_compaction(segments):
+    for n in range(20):
+        segments.store("test", payload(n))
+    assert segments.compact() > 0
+    key = modules.db.event_key(payload(0))
+    assert key not in segments.keys
+    assert segments.locate("ev0") is None
+    assert segments.seen(key)
+
+
+def test_segment_keys_rebuilt_on_open(db, tmp_path):
+    directory = str(tmp_path / "segments")
+    backend = storage.SegmentLogBackend(directory, 1024, compact_interval=0)
+    for n in range(5):
+        backend.store("test", payload(n))
+    backend.close()
+
+    reopened = storage.SegmentLogBackend(directory, 1024, compact_interval=0)
+    assert reopened.seen(modules.db.event_key(payload(3)))
+    assert reopened.locate("ev4") == 4
+    reopened.close()
+
+
+def test_segment_fetch_spans_log_and_sqlite(segments):
+    for n in range(20):
+        segments.store("test", payload(n))
+    segments.compact()
+    fetched = [p["event_id"] for p in segments.fetch(limit=20)]
+    assert fetched[0] == "ev19"
+    assert sorted(fetched) == sorted(f"ev{n}" for n in range(20))
+
+
+def test_store_many_reports_duplicates(db, segments):
+    for base, backend in ((0, storage.SQLiteBackend()), (10, segments)):
+        backend.store("test", payload(base + 1))
+        stored = backend.store_many("test", [payload(base), payload(base + 1), payload(base + 2)])
+        assert [seq is not None for seq in stored] == [True, False, True]
+        assert backend.store("test", payload(base + 2)) is None
+
+
+def test_segment_compaction_folds_active_segment(segments):
+    segments.store("test", payload(1))
+    assert segments.compact() == 1
+    assert modules.db.last_event_id() == 1
+    assert segments.compact() == 0
+    assert segments.locate("ev1") is None
+    assert segments.store("test", payload(2)) is not None
@@ -0,0 +1,105 @@
+import asyncio
+import threading
+
+import pytest
+
+import modules.timeline as timeline
+
+
+@pytest.fixture(autouse=True)
+def empty_buffer(monkeypatch):
+    monkeypatch.setattr(timeline, "_buffer", [])
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Monotonic clock the test advances by hand (seconds)."""
+    now = [1000.0]
+    monkeypatch.setattr(timeline.time, "monotonic", lambda: now[0])
+    return now
+
+
+def run_event(clock, event_id, stages):
+    t = timeline.Timeline(event_id)
+    for stage, seconds in stages:
+        clock[0] += seconds
+        t.mark(stage)
+    clock[0] += 0.001
+    t.finish("grabbed")
+    return t
+
+
+def test_marks_are_relative_to_receipt(clock):
+    t = timeline.Timeline("e1")
+    clock[0] += 0.25
+    t.mark("filter")
+    assert t.marks == [("received", 0.0), ("filter", 250.0)]
+
+
+def test_finish_is_idempotent(db, clock):
+    t = run_event(clock, "e1", [("filter", 0.01)])
+    t.finish("rejected")
+    assert [m[0] for m in t.marks] == ["received", "filter", "grabbed"]
+
+
+def test_report_stage_durations(db, clock):
+    run_event(clock, "fast", [("filter", 0.010), ("radarr", 0.020)])
+    run_event(clock, "slow", [("filter", 0.010), ("radarr", 0.200)])
+    result = timeline.report()
+
+    assert result["events"] == 2
+    assert result["stages"]["filter"]["count"] == 2
+    assert result["stages"]["filter"]["avg_ms"] == pytest.approx(10.0)
+    assert result["stages"]["radarr"]["max_ms"] == pytest.approx(200.0)
+    assert result["slowest"][0]["event_id"] == "slow"
+    assert result["slowest"][0]["stages"]["radarr"] == pytest.approx(200.0)
+
+
+def test_report_flushes_buffer(db, clock, monkeypatch):
+    monkeypatch.setattr(timeline, "FLUSH_SECONDS", 3600.0)
+    monkeypatch.setattr(timeline, "_last_flush", clock[0])
+    run_event(clock, "buffered", [("filter", 0.01)])
+    assert timeline._buffer
+    assert timeline.report()["events"] == 1
+    assert not timeline._buffer
+
+
+def test_report_limits_events(db, clock):
+    for n in range(5):
+        run_event(clock, f"e{n}", [("filter", 0.01)])
+    assert timeline.report(events=3, slowest=2)["events"] == 3
+    assert len(timeline.report(events=3, slowest=2)["slowest"]) == 2
+
+
+def test_percentile():
+    assert timeline._percentile([], 50) == 0.0
+    assert timeline._percentile([5, 1, 3], 50) == 3
+    assert timeline._percentile(list(range(101)), 95) == 95
+
+
+def test_finish_flushes_off_the_event_loop(db, monkeypatch):
+    monkeypatch.setattr(timeline, "FLUSH_SECONDS", 0.0)
+    threads = []
+    real = timeline.modules.db.store_timeline
+    monkeypatch.setattr(timeline.modules.db, "store_timeline",
+                        lambda rows: threads.append(threading.get_ident()) or real(rows))
+
+    async def run():
+        timeline.Timeline("e1").finish("grabbed")
+        # the write is handed to a worker thread; wait for it to land
+        for _ in range(100):
+            if threads:
+                break
+            await asyncio.sleep(0.01)
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(run())
+    assert threads and threads[0] != loop_thread
+    assert timeline.report()["events"] == 1
+
+
+def test_flush_inline_without_loop(db, clock, monkeypatch):
+    monkeypatch.setattr(timeline, "_last_flush", clock[0])
+    clock[0] += timeline.FLUSH_SECONDS
+    run_event(clock, "e1", [("filter", 0.01)])
+    assert not timeline._buffer
@@ -0,0 +1,40 @@
+import pytest
+
+import modules.utils as utils
+
+
+def config(radarr=None, qbittorrent=None):
+    return {
+        "autobrr": {"host": "http://autobrr", "apikey": "k"},
+        "radarr": radarr or {"host": "http://radarr", "apikey": "k"},
+        "qbittorrent": qbittorrent or {"host": "http://qbit", "username": "u", "password": "p"},
+        "filters": {"min_seeders": 1, "quality": ["1080p"]},
+    }
+
+
+RADARRS = {"instances": [
+    {"name": "hd", "host": "http://hd", "apikey": "a", "match": {"resolution": ["1080p"]}},
+    {"name": "uhd", "host": "http://uhd", "apikey": "b", "match": {"resolution": ["2160p"]}},
+]}
+
+
+def test_single_host_sections():
+    utils.validate_config(config())
+    utils.process_radarr(config(), None)
+
+
+def test_instances_lists():
+    qbits = {"instances": [{"name": "main", "host": "http://q", "username": "u", "password": "p"}]}
+    utils.validate_config(config(RADARRS, qbits))
+    utils.process_radarr(config(RADARRS), None)
+
+
+@pytest.mark.parametrize("radarr, message", [
+    ({"instances": [{"name": "hd", "host": "http://hd"}]}, "instance 'hd': apikey"),
+    ({"instances": [{"name": "hd", "host": "http://hd", "apikey": "a", "match": {"quality": ["x"]}}]}, "quality"),
+    ({"instances": RADARRS["instances"] + RADARRS["instances"][:1]}, "Duplicate instance name"),
+    ({"apikey": "k"}, "No instances"),
+])
+def test_invalid_instances(radarr, message):
+    with pytest.raises(ValueError, match=message):
+        utils.validate_config(config(radarr))
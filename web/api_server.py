@@ -6,27 +6,43 @@
 __version__ = "v0.6.5-beta"
 
 #from pathlib import Path
-#from fastapi import FastAPI, Request, Form
-#from fastapi.responses import RedirectResponse, HTMLResponse, JSONResponse, StreamingResponse
-#from fastapi.staticfiles import StaticFiles
-#from fastapi.templating import Jinja2Templates
 import fastapi
+from fastapi import FastAPI, Request, WebSocket
+from fastapi.responses import HTMLResponse, StreamingResponse
+from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel
 from typing import List, Optional
-import modules.Jaylog
+from modules.Jaylog import mklog
 import modules.autobrr
+import modules.models
+import modules.json
+import modules.scheduler
+import modules.instances
+import modules.debug
+import modules.timeline
+import modules.feed
+import modules.db
+import web.httpcache
 import sys
 import subprocess
 import logging
 import time
 import os
-import json
+import secrets
 import httpx
 import asyncio
+import contextlib
 
 sys.dont_write_bytecode = True
 
-app = FastAPI()
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    yield
+    # Timelines are written in batches; don't lose the last partial one.
+    await asyncio.to_thread(modules.timeline.flush)
+
+
+app = FastAPI(lifespan=lifespan)
 
 # ===========================================================================================
 #  PATH HELPERS
@@ -43,8 +59,18 @@ JSON_DIR = os.path.join(PROJECT_ROOT, "json")
 CONFIG_PATH = os.getenv("SQUATFLIX_CONFIG", os.path.join(JSON_DIR, "config.json"))
 LOG_PATH = os.getenv("SQUATFLIX_LOG", os.path.join(LOG_DIR, "squatflix.log"))
 
+EVENTS_PAGE_SIZE = 100
+
+# Debug endpoints are off unless a token is set; requests must send it as X-Debug-Token
+DEBUG_TOKEN = os.getenv("SQUATFLIX_DEBUG_TOKEN")
+
 templates = Jinja2Templates(directory=TEMPLATES_DIR)
-app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
+static_assets = web.httpcache.StaticAssets(STATIC_DIR)
+app.mount("/static", static_assets, name="static")
+templates.env.globals["static_url"] = static_assets.url
+
+# Rendered pages are served from memory until the data behind them changes
+pages = web.httpcache.PageCache(TEMPLATES_DIR, salt=static_assets.salt())
 
 
 # --------------------------------------------------------------- PATH HELPERS
@@ -55,14 +81,19 @@ app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
 #   Lifecycle Logging
 # ------------------------------------------------------------
 
-ApiLogger = setup_logger(level="DEBUG", log_path=LOG_PATH)
+ApiLogger = mklog("squatflix.api", level="DEBUG", logfile=LOG_PATH)
 
+# Lines nobody is streaming are dropped once the queue is full
+LOG_QUEUE_SIZE = 1000
 
-log_queue = asyncio.Queue()
+log_queue = asyncio.Queue(maxsize=LOG_QUEUE_SIZE)
 
 class QueueHandler(logging.Handler):
     def emit(self, record):
-        asyncio.create_task(log_queue.put(self.format(record)))
+        try:
+            log_queue.put_nowait(self.format(record))
+        except asyncio.QueueFull:
+            pass
 
 root_logger = logging.getLogger()
 root_logger.setLevel(logging.DEBUG)
@@ -89,91 +120,119 @@ uvicorn_error.addHandler(queue_handler)
 #   Autobrr Webhook Listener
 # ------------------------------------------------------------
 
-class AutoBRRPayload(BaseModel):
-    Artists: Optional[str] = None
-    Audio: Optional[List[str]] = None
-    AudioChannels: Optional[str] = None
-    AudioFormat: Optional[str] = None
-    Bitrate: Optional[str] = None
-    Bonus: Optional[List[str]] = None
-    Categories: Optional[List[str]] = None
-    Category: Optional[str] = None
-    Codec: Optional[List[str]] = None
-    Container: Optional[str] = None
-    CurrentDay: Optional[int] = None
-    CurrentHour: Optional[int] = None
-    CurrentMinute: Optional[int] = None
-    CurrentMonth: Optional[int] = None
-    CurrentSecond: Optional[int] = None
-    CurrentYear: Optional[int] = None
-    Day: Optional[int] = None
-    Description: Optional[str] = None
-    DownloadURL: Optional[str] = None
-    Episode: Optional[int] = None
-    FilterID: Optional[int] = None
-    FilterName: Optional[str] = None
-    Freeleech: Optional[bool] = None
-    FreeleechPercent: Optional[int] = None
-    Group: Optional[str] = None
-    GroupID: Optional[str] = None
-    HasCue: Optional[bool] = None
-    HasLog: Optional[bool] = None
-    HDR: Optional[str] = None
-    Implementation: Optional[str] = None
-    Indexer: Optional[str] = None
-    IndexerIdentifier: Optional[str] = None
-    IndexerIdentifierExternal: Optional[str] = None
-    IndexerName: Optional[str] = None
-    InfoUrl: Optional[str] = None
-    IsDuplicate: Optional[bool] = None
-    Language: Optional[List[str]] = None
-    Leechers: Optional[int] = None
-    LogScore: Optional[int] = None
-    MagnetURI: Optional[str] = None
-    MetaIMDB: Optional[str] = None
-    Month: Optional[int] = None
-    Origin: Optional[str] = None
-    Other: Optional[List[str]] = None
-    PreTime: Optional[str] = None
-    Proper: Optional[bool] = None
-    Protocol: Optional[str] = None
-    RecordLabel: Optional[str] = None
-    Region: Optional[str] = None
-    Repack: Optional[bool] = None
-    Resolution: Optional[str] = None
-    Season: Optional[int] = None
-    Seeders: Optional[int] = None
-    Size: Optional[int] = None
-    SizeString: Optional[str] = None
-    SkipDuplicateProfileID: Optional[int] = None
-    SkipDuplicateProfileName: Optional[str] = None
-    Source: Optional[str] = None
-    Tags: Optional[str] = None
-    Title: Optional[str] = None
-    TorrentDataRawBytes: Optional[str] = None
-    TorrentHash: Optional[str] = None
-    TorrentID: Optional[str] = None
-    TorrentName: Optional[str] = None
-    TorrentPathName: Optional[str] = None
-    TorrentTmpFile: Optional[str] = None
-    TorrentUrl: Optional[str] = None
-    Type: Optional[str] = None
-    Uploader: Optional[str] = None
-    Website: Optional[str] = None
-    Year: Optional[int] = None
-
-
 @app.post("/webhook/autobrr")
-async def autobrr_webhook(payload: AutoBRRPayload):
-    result = acceptPayload(payload)
-    logger.info(f"DATA has arrived VIA Autobrr API")
-    logger.info(f"It has been handed off to autobrr.py")
+async def autobrr_webhook(payload: modules.models.AutoBRRPayload):
+    timeline = modules.timeline.Timeline()
+    result = await modules.autobrr.acceptPayload(payload.model_dump(), timeline)
+    ApiLogger.info(f"DATA has arrived VIA Autobrr API")
+    ApiLogger.info(f"It has been handed off to autobrr.py")
     return {
         "status": result.get("status", "error"),
+        "event_id": timeline.event_id,
         "title": payload.Title,
         "year": payload.Year
     }
 
+# ------------------------------------------------------------
+#   Batch Webhook (JSON array or NDJSON)
+# ------------------------------------------------------------
+
+BATCH_GROUP = 200
+
+@app.post("/webhook/autobrr/batch")
+async def autobrr_batch_webhook(request: fastapi.Request):
+    """
+    Body is read as a stream and parsed record by record; every
+    BATCH_GROUP valid records go through intake together.
+    """
+    results = []
+    group = []
+
+    async def drain():
+        outcomes = await modules.autobrr.acceptBatch([payload for _, payload in group])
+        results.extend({"index": index, **outcome} for (index, _), outcome in zip(group, outcomes))
+        group.clear()
+
+    async for index, record, error in modules.json.iter_records(request.stream()):
+        if error is None:
+            try:
+                group.append((index, modules.models.AutoBRRPayload(**record).model_dump()))
+            except (TypeError, ValueError) as e:
+                error = str(e)
+        if error is not None:
+            results.append({"index": index, "status": "error", "reason": error})
+        if len(group) >= BATCH_GROUP:
+            await drain()
+    if group:
+        await drain()
+
+    results.sort(key=lambda r: r["index"])
+    accepted = sum(1 for r in results if r["status"] == "accepted")
+    ApiLogger.info(f"Batch webhook: {len(results)} records, {accepted} accepted")
+    return {"received": len(results), "accepted": accepted, "results": results}
+
+# ------------------------------------------------------------
+#   Grab Scheduler Metrics
+# ------------------------------------------------------------
+
+@app.get("/metrics/scheduler")
+def scheduler_metrics():
+    return dict(modules.scheduler.scheduler.metrics(), instances=modules.instances.status())
+
+# ------------------------------------------------------------
+#   Event Timeline (announce-to-grab latency)
+# ------------------------------------------------------------
+
+@app.get("/metrics/timeline")
+def timeline_metrics(events: int = 1000, slowest: int = 20):
+    return modules.timeline.report(events, slowest)
+
+# ------------------------------------------------------------
+#   Debug / Profiling (off unless SQUATFLIX_DEBUG_TOKEN is set)
+# ------------------------------------------------------------
+
+def require_debug(x_debug_token: Optional[str] = fastapi.Header(None)):
+    if not DEBUG_TOKEN:
+        raise fastapi.HTTPException(status_code=404)
+    if not x_debug_token or not secrets.compare_digest(x_debug_token.encode("utf-8"), DEBUG_TOKEN.encode("utf-8")):
+        raise fastapi.HTTPException(status_code=403, detail="Bad debug token")
+
+
+@app.get("/debug/profile", dependencies=[fastapi.Depends(require_debug)])
+async def debug_profile(seconds: float = 10.0, mode: str = "sample", interval_ms: float = 5.0):
+    try:
+        if mode == "cprofile":
+            report = await modules.debug.cprofile(seconds)
+        else:
+            report = await modules.debug.sample_profile(seconds, interval_ms / 1000)
+    except modules.debug.DebugBusyError as e:
+        raise fastapi.HTTPException(status_code=409, detail=str(e))
+    return fastapi.responses.PlainTextResponse(report)
+
+
+@app.post("/debug/memory/snapshot", dependencies=[fastapi.Depends(require_debug)])
+def debug_memory_snapshot(limit: int = 25, seconds: float = modules.debug.TRACE_SECONDS):
+    return modules.debug.take_snapshot(limit, seconds)
+
+
+@app.get("/debug/memory/diff", dependencies=[fastapi.Depends(require_debug)])
+def debug_memory_diff(first: int, second: int, limit: int = 25):
+    try:
+        return modules.debug.diff_snapshots(first, second, limit)
+    except KeyError as e:
+        raise fastapi.HTTPException(status_code=404, detail=str(e))
+
+
+@app.delete("/debug/memory", dependencies=[fastapi.Depends(require_debug)])
+def debug_memory_stop():
+    modules.debug.stop_tracing()
+    return {"status": "stopped"}
+
+
+@app.get("/debug/tasks", dependencies=[fastapi.Depends(require_debug)])
+async def debug_tasks():
+    return fastapi.responses.PlainTextResponse(modules.debug.dump_tasks())
+
 # ------------------------------------------------------------
 #   WebSocket Log Streaming
 # ------------------------------------------------------------
@@ -211,7 +270,8 @@ async def stream_logs():
 
 @app.get("/", response_class=HTMLResponse)
 def dashboard(request: Request):
-    return templates.TemplateResponse("index.html", {"request": request})
+    return pages.respond(request, "index.html", None,
+                         lambda: templates.get_template("index.html").render(request=request))
 
 # ------------------------------------------------------------
 #   Events
@@ -219,22 +279,41 @@ def dashboard(request: Request):
 
 @app.get("/events", response_class=HTMLResponse)
 def events(request: Request):
-    event_list = []
     try:
-        for fname in sorted(os.listdir(JSON_DIR), reverse=True):
-            if fname.startswith("autobrr_event_") and fname.endswith(".json"):
-                with open(os.path.join(JSON_DIR, fname)) as f:
-                    data = json.load(f)
-                    event_list.append({
-                        "filename": fname,
-                        "title": data.get("releaseName", "Unknown"),
-                        "indexer": data.get("indexer", "Unknown"),
-                        "timestamp": fname.replace("autobrr_event_", "").replace(".json", "")
-                    })
+        version = modules.db.last_event_id()
     except Exception as e:
         ApiLogger.warning(f"Failed to load events: {e}")
+        version = None
 
-    return templates.TemplateResponse("events.html", {"request": request, "events": event_list})
+    def render():
+        event_list = []
+        try:
+            event_list = modules.db.fetch_events_latest(EVENTS_PAGE_SIZE)
+        except Exception as e:
+            ApiLogger.warning(f"Failed to load events: {e}")
+        last_id = event_list[0]["id"] if event_list else 0
+        return templates.get_template("events.html").render(request=request, events=event_list, last_id=last_id)
+
+    return pages.respond(request, "events.html", version, render)
+
+
+@app.get("/events/stream")
+async def events_stream(since_id: int = 0, last_event_id: Optional[str] = fastapi.Header(None)):
+    """
+    Server-sent events: one compact JSON row per newly stored event.
+    Browsers resume via Last-Event-ID; since_id covers the first connect.
+    """
+    if last_event_id and last_event_id.isdigit():
+        since_id = max(since_id, int(last_event_id))
+
+    async def event_generator():
+        async for row in modules.feed.feed.subscribe(since_id):
+            if row is None:
+                yield b": keepalive\n\n"
+            else:
+                yield b"id: %d\ndata: %s\n\n" % (row["id"], modules.json.encode(row))
+
+    return fastapi.responses.StreamingResponse(event_generator(), media_type="text/event-stream")
 
 # ------------------------------------------------------------
 #   Config
@@ -244,13 +323,20 @@ def events(request: Request):
 @app.get("/config", response_class=HTMLResponse)
 def config_view(request: Request):
     try:
-        with open(CONFIG_PATH) as f:
-            config_data = json.load(f)
-    except Exception as e:
-        ApiLogger.warning(f"Failed to load config: {e}")
-        config_data = {}
+        stat = os.stat(CONFIG_PATH)
+        version = (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        version = None
+
+    def render():
+        try:
+            config_data = modules.json.load(CONFIG_PATH)
+        except Exception as e:
+            ApiLogger.warning(f"Failed to load config: {e}")
+            config_data = {}
+        return templates.get_template("config.html").render(request=request, config=config_data)
 
-    return templates.TemplateResponse("config.html", {"request": request, "config": config_data})
+    return pages.respond(request, "config.html", version, render)
 
 #===================================================================
 #      API-Call
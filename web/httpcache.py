@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+
+# =============================================================================
+# File: httpcache.py
+# Purpose: Rendered-page cache, ETags, compression and static asset caching
+# Author: Joshua
+# Created: 2025-10-02
+# =============================================================================
+
+__version__ = "v0.1.0-beta"
+
+# ============================== Imports ======================================
+
+import gzip
+import hashlib
+import os
+import threading
+from urllib.parse import parse_qs
+import fastapi
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# ============================== Constants ====================================
+
+MIN_COMPRESS_BYTES = 1024
+STATIC_MAX_AGE = 365 * 24 * 3600
+COMPRESSIBLE = ("text/", "application/javascript", "application/json", "image/svg+xml")
+
+#===================================================================
+#      Encoding
+#===================================================================
+
+def _variants(body: bytes) -> dict:
+    """
+    The body in every encoding we can serve, compressed once up front.
+    """
+    variants = {"identity": body}
+    if len(body) >= MIN_COMPRESS_BYTES:
+        variants["gzip"] = gzip.compress(body, compresslevel=6, mtime=0)
+        if brotli is not None:
+            variants["br"] = brotli.compress(body, quality=5)
+    return variants
+
+
+def negotiate(accept_encoding: str, variants: dict) -> str:
+    """
+    Pick br, then gzip, then identity, honouring q=0 exclusions.
+    """
+    accepted = {}
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+    for coding in ("br", "gzip"):
+        if coding in variants and accepted.get(coding, accepted.get("*", 0)) > 0:
+            return coding
+    return "identity"
+
+
+def etag(tag: str, encoding: str) -> str:
+    """
+    Strong ETag; each encoding is a different representation.
+    """
+    return f'"{tag}"' if encoding == "identity" else f'"{tag}-{encoding}"'
+
+
+def matches(if_none_match: str, tag: str) -> str:
+    """
+    The If-None-Match entry naming any representation of `tag`, or None.
+    """
+    if not if_none_match:
+        return None
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return etag(tag, "identity")
+        if candidate.removeprefix("W/").strip('"').split("-")[0] == tag:
+            return candidate.removeprefix("W/")
+    return None
+
+#===================================================================
+#      Page Cache
+#===================================================================
+
+class PageCache:
+    """
+    Rendered pages keyed on the version of the data behind them (a config
+    file's stat, the newest event id). A request carrying the current
+    ETag gets a 304 without rendering; otherwise the body is rendered and
+    compressed once per version and served from memory until it changes.
+    """
+
+    def __init__(self, templates_dir: str, salt: str = ""):
+        self.templates_dir = templates_dir
+        self.salt = salt
+        self.pages = {}      # template -> (tag, variants)
+        self.lock = threading.Lock()
+
+    def _tag(self, template: str, version) -> str:
+        try:
+            mtime = os.stat(os.path.join(self.templates_dir, template)).st_mtime_ns
+        except OSError:
+            mtime = 0
+        key = f"{template}|{mtime}|{self.salt}|{version!r}".encode("utf-8")
+        return hashlib.sha1(key).hexdigest()[:20]
+
+    def respond(self, request: fastapi.Request, template: str, version, render) -> fastapi.Response:
+        """
+        `render()` returns the page as str and is only called on a miss.
+        """
+        tag = self._tag(template, version)
+        headers = {"Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+
+        matched = matches(request.headers.get("if-none-match"), tag)
+        if matched:
+            headers["ETag"] = matched
+            return fastapi.Response(status_code=304, headers=headers)
+
+        with self.lock:
+            entry = self.pages.get(template)
+        if entry is None or entry[0] != tag:
+            entry = (tag, _variants(render().encode("utf-8")))
+            with self.lock:
+                self.pages[template] = entry
+
+        variants = entry[1]
+        encoding = negotiate(request.headers.get("accept-encoding"), variants)
+        headers["ETag"] = etag(tag, encoding)
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return fastapi.Response(variants[encoding], media_type="text/html; charset=utf-8", headers=headers)
+
+#===================================================================
+#      Static Assets
+#===================================================================
+
+class StaticAssets(StaticFiles):
+    """
+    StaticFiles plus content fingerprints and compression. Templates link
+    assets through url(), which appends ?v=<hash>; requests carrying the
+    current hash are cacheable for a year, anything else must revalidate.
+    Text assets are served gzip/br compressed from memory.
+    """
+
+    def __init__(self, directory: str):
+        super().__init__(directory=directory)
+        self.root = directory
+        self.fingerprints = {}   # path -> (mtime_ns, hash)
+        self.compressed = {}     # path -> (mtime_ns, variants)
+
+    def fingerprint(self, path: str) -> str:
+        full = os.path.join(self.root, path)
+        mtime = os.stat(full).st_mtime_ns
+        cached = self.fingerprints.get(path)
+        if cached is None or cached[0] != mtime:
+            with open(full, "rb") as f:
+                cached = (mtime, hashlib.sha1(f.read()).hexdigest()[:10])
+            self.fingerprints[path] = cached
+        return cached[1]
+
+    def url(self, path: str) -> str:
+        try:
+            return f"/static/{path}?v={self.fingerprint(path)}"
+        except OSError:
+            return f"/static/{path}"
+
+    def salt(self) -> str:
+        """
+        One hash over every asset, so pages linking them change when they do.
+        """
+        names = sorted(os.listdir(self.root))
+        return hashlib.sha1("".join(self.url(n) for n in names).encode("utf-8")).hexdigest()[:10]
+
+    async def get_response(self, path: str, scope) -> fastapi.Response:
+        response = await super().get_response(path, scope)
+        if response.status_code not in (200, 304):
+            return response
+
+        version = parse_qs(scope.get("query_string", b"").decode("latin-1")).get("v", [None])[0]
+        try:
+            current = self.fingerprint(path)
+        except OSError:
+            current = None
+        if version and version == current:
+            response.headers["Cache-Control"] = f"public, max-age={STATIC_MAX_AGE}, immutable"
+        else:
+            response.headers["Cache-Control"] = "no-cache"
+
+        media_type = response.headers.get("content-type", "")
+        if response.status_code != 200 or not media_type.startswith(COMPRESSIBLE):
+            return response
+
+        full = os.path.join(self.root, path)
+        mtime = os.stat(full).st_mtime_ns
+        cached = self.compressed.get(path)
+        if cached is None or cached[0] != mtime:
+            with open(full, "rb") as f:
+                cached = (mtime, _variants(f.read()))
+            self.compressed[path] = cached
+
+        request_headers = Headers(scope=scope)
+        encoding = negotiate(request_headers.get("accept-encoding"), cached[1])
+        response.headers["Vary"] = "Accept-Encoding"
+        if encoding == "identity":
+            return response
+
+        headers = {k: v for k, v in response.headers.items() if k not in ("content-length", "etag")}
+        file_tag = response.headers.get("etag", "").strip('"')
+        if file_tag:
+            headers["ETag"] = etag(file_tag, encoding)
+            # StaticFiles only recognises the uncompressed ETag
+            matched = matches(request_headers.get("if-none-match"), file_tag)
+            if matched:
+                headers["ETag"] = matched
+                return fastapi.Response(status_code=304, headers=headers)
+        headers["Content-Encoding"] = encoding
+        return fastapi.Response(cached[1][encoding], headers=headers)